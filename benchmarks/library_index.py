@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Library Index Benchmark
+Compares candidate filtering against the old list of TMDB IDs with
+LibraryIndex, set-backed and memory-mapped, with and without a Bloom
+filter in front, as the library grows.
+
+Usage: python3 benchmarks/library_index.py [candidates]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from media_sync import BloomFilter, LibraryIndex, SortedIdFile
+
+LIBRARY_SIZES = [1000, 5000, 10000, 30000]
+
+
+def filter_candidates(candidates, existing) -> int:
+    """Count candidates not yet in the library, as process_movies does"""
+    return sum(1 for tmdb_id in candidates if tmdb_id not in existing)
+
+
+def time_filter(candidates, existing) -> float:
+    started = time.perf_counter()
+    filter_candidates(candidates, existing)
+    return time.perf_counter() - started
+
+
+def main():
+    candidate_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(42)
+    
+    print(f"Filtering {candidate_count} candidates")
+    print(
+        f"{'library':>10} {'list (ms)':>12} {'set (ms)':>12} {'mmap (ms)':>12} "
+        f"{'bloom (ms)':>12} {'false pos.':>11} {'speedup':>10}"
+    )
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in LIBRARY_SIZES:
+            library = rng.sample(range(1, size * 10), size)
+            # Mostly existing titles, like scanning a large list against a large library
+            candidates = rng.choices(library, k=candidate_count * 3 // 4)
+            candidates += [rng.randrange(size * 10, size * 20) for _ in range(candidate_count - len(candidates))]
+            
+            id_path = Path(tmp_dir) / f"library_{size}.idx"
+            SortedIdFile.write(id_path, library)
+            
+            list_time = time_filter(candidates, library)
+            set_time = time_filter(candidates, LibraryIndex(library))
+            mmap_time = time_filter(candidates, LibraryIndex(SortedIdFile(id_path)))
+            
+            # Memory-mapped index behind a saved 1% Bloom filter, as library.bloom sets it up
+            bloom_path = Path(tmp_dir) / f"library_{size}.bloom"
+            bloom = BloomFilter(size, 0.01)
+            for tmdb_id in library:
+                bloom.add(tmdb_id)
+            bloom.write(bloom_path)
+            bloomed = LibraryIndex(SortedIdFile(id_path))
+            bloomed.bloom = BloomFilter.load(bloom_path)
+            bloom_time = time_filter(candidates, bloomed)
+            
+            print(
+                f"{size:>10} {list_time * 1000:>12.2f} {set_time * 1000:>12.2f} "
+                f"{mmap_time * 1000:>12.2f} {bloom_time * 1000:>12.2f} "
+                f"{bloomed.bloom_stats['false_positives']:>11} {list_time / set_time:>9.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,35 @@ Synchronizes movies and shows from Trakt lists to Radarr/Sonarr
 Based on Real-Debrid capacity
 """
 
+import argparse
+import asyncio
+import bisect
+import codecs
+import contextvars
+import gzip
+import hashlib
+import heapq
 import json
+import math
+import mmap
+import os
+import random
 import requests
+import struct
 import logging
-from datetime import datetime, timedelta, time as dt_time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone, time as dt_time
+from email.utils import parsedate_to_datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
 import time
+from array import array
 
 # Setup logging
 logging.basicConfig(
@@ -20,13 +42,1287 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+RD_API_URL = "https://api.real-debrid.com"
+MDBLIST_API_URL = "https://api.mdblist.com"
+
+
+def load_json_state(path: Path, default):
+    """Read a JSON state file, falling back to default if missing or unreadable"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable state file {path}: {e}")
+        return default
+
+
+def save_json_state(path: Path, data):
+    """Atomically replace a JSON state file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Failed to save state file {path}: {e}")
+        tmp_path.unlink(missing_ok=True)
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator:
+    """
+    Decode a top-level JSON array one element at a time
+    Only the element being decoded and the unread tail of the current chunk
+    are held in memory, however large the array is.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    chunk_iter = iter(chunks)
+    buffer = ''
+    index = 0
+    started = False
+    finished = False
+
+    def more() -> bool:
+        """Append the next decoded text to the buffer; False (buffer untouched) once exhausted"""
+        nonlocal buffer, index, finished
+        if finished:
+            return False
+        for chunk in chunk_iter:
+            text = utf8.decode(chunk)
+            if text:
+                buffer = buffer[index:] + text
+                index = 0
+                return True
+        finished = True
+        utf8.decode(b'', final=True)
+        return False
+
+    while True:
+        # Skip whitespace and separators up to the next element
+        while True:
+            while index < len(buffer) and buffer[index] in ' \t\r\n,':
+                index += 1
+            if index < len(buffer) or not more():
+                break
+        if index >= len(buffer):
+            raise ValueError("Unexpected end of JSON array")
+        
+        if not started:
+            if buffer[index] != '[':
+                raise ValueError("Expected a JSON array")
+            started = True
+            index += 1
+            continue
+        if buffer[index] == ']':
+            return
+        
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, index)
+            except json.JSONDecodeError:
+                # Most likely the element continues in the next chunk
+                if not more():
+                    raise
+                continue
+            # A number or literal running up to the end of the buffer may continue
+            # in the next chunk (e.g. "1." + "5"), so wait for a delimiter
+            if not isinstance(element, (dict, list, str)):
+                tail = end
+                while tail < len(buffer) and buffer[tail] in '0123456789+-.eE':
+                    tail += 1
+                if tail == len(buffer) and more():
+                    continue
+            break
+        index = end
+        yield element
+
+
+# (deadline, label) of the phase running in the current thread or task
+_current_phase: contextvars.ContextVar[Optional[Tuple[float, str]]] = contextvars.ContextVar(
+    'current_phase', default=None
+)
+
+
+class DeadlineExceeded(Exception):
+    """The run, or the phase it was in, ran out of time"""
+
+
+class RunBudget:
+    """
+    Run-wide deadline with optional per-phase sub-budgets
+    Every HTTP call is given the time left as its timeout, so a hung upstream
+    can never hold the run past its deadline.
+    """
+
+    def __init__(self, deadline: float, phase_limits: Optional[Dict[str, float]] = None,
+                 request_timeout: float = 30,
+                 on_phase_complete: Optional[Callable[[str, float], None]] = None):
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline
+        self.total = deadline
+        self.phase_limits = phase_limits or {}
+        self.request_timeout = request_timeout
+        self.on_phase_complete = on_phase_complete
+        self.completed: List[Tuple[str, float]] = []
+        self.expired: List[str] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        """Seconds left in the current phase (or the run, outside any phase)"""
+        phase = _current_phase.get()
+        deadline = phase[0] if phase else self.deadline
+        return deadline - time.monotonic()
+
+    def run_expired(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def check(self):
+        """Raise DeadlineExceeded once the current budget is spent"""
+        if self.remaining() <= 0:
+            phase = _current_phase.get()
+            raise DeadlineExceeded(f"{phase[1] if phase else 'run'} budget expired")
+
+    def timeout(self) -> float:
+        """Timeout for the next request: the remaining budget, capped at request_timeout"""
+        self.check()
+        return min(self.request_timeout, self.remaining())
+
+    @contextmanager
+    def phase(self, pipeline: str, name: str):
+        """Run a block under the named phase's sub-budget"""
+        label = f"{pipeline} {name}"
+        started = time.monotonic()
+        deadline = self.deadline
+        if name in self.phase_limits:
+            deadline = min(deadline, started + self.phase_limits[name])
+        parent = _current_phase.get()
+        if parent:
+            deadline = min(deadline, parent[0])
+        
+        token = _current_phase.set((deadline, label))
+        try:
+            yield
+            # Methods that swallow request errors hide timeouts; catch them here
+            self.check()
+        except DeadlineExceeded:
+            with self._lock:
+                self.expired.append(label)
+            raise
+        else:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self.completed.append((label, elapsed))
+            if self.on_phase_complete:
+                self.on_phase_complete(label, elapsed)
+        finally:
+            _current_phase.reset(token)
+
+    def log_report(self, added: Dict[str, int]):
+        """Summarize how the run used its budget"""
+        elapsed = time.monotonic() - self.started
+        logger.info(f"Run took {elapsed:.1f}s of {self.total:.0f}s budget")
+        if not self.expired:
+            return
+        
+        done = ", ".join(f"{label} ({seconds:.1f}s)" for label, seconds in self.completed) or "none"
+        logger.warning(f"Partial run - expired: {', '.join(self.expired)}; completed: {done}")
+        logger.warning(f"Added before expiry: {added['movies']} movies, {added['shows']} shows")
+
+
+class CircuitOpenError(Exception):
+    """Request skipped because the upstream's circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker for one upstream service
+    After failure_threshold consecutive failures the circuit opens and
+    requests fail instantly; once cooldown has passed a single trial request
+    is let through, closing the circuit on success or reopening it on failure.
+    State is plain data so it can be persisted across runs.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int, cooldown: float, state: Optional[Dict] = None):
+        state = state or {}
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.state = state.get('state', self.CLOSED)
+        self.failures = int(state.get('failures', 0))
+        self.opened_at = float(state.get('opened_at', 0))
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether the service is worth trying, without claiming the half-open trial"""
+        with self._lock:
+            return self.state != self.OPEN or time.time() - self.opened_at >= self.cooldown
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.time() - self.opened_at < self.cooldown:
+                    return False
+                self.state = self.HALF_OPEN
+                logger.info(f"Circuit for {self.name} half-open, sending a trial request")
+            if self.state == self.HALF_OPEN:
+                if self.trial_in_flight:
+                    return False
+                self.trial_in_flight = True
+            return True
+
+    def release(self):
+        """Free the trial slot after a request that says nothing about the service's health"""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            # An unfinished trial leaves the circuit open for the next run to retry
+            state = self.OPEN if self.state == self.HALF_OPEN else self.state
+            return {'state': state, 'failures': self.failures, 'opened_at': self.opened_at}
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` requests per second with bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class QuotaGate:
+    """
+    Thread-safe admission control for a fixed number of successful operations
+    Work reserves a slot before it starts and either commits or releases it,
+    so however many operations are in flight no more than `quota` succeed.
+    """
+
+    def __init__(self, quota: int):
+        self.quota = quota
+        self.committed = 0
+        self.reserved = 0
+        self._lock = threading.Lock()
+
+    @property
+    def filled(self) -> bool:
+        return self.committed >= self.quota
+
+    def reserve(self) -> bool:
+        """Claim a slot if the quota can still be reached without overshooting"""
+        with self._lock:
+            if self.committed + self.reserved >= self.quota:
+                return False
+            self.reserved += 1
+            return True
+
+    def commit(self):
+        with self._lock:
+            self.reserved -= 1
+            self.committed += 1
+
+    def release(self):
+        with self._lock:
+            self.reserved -= 1
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, honoring Retry-After
+    Retries draw from a budget shared by the whole run so a struggling
+    upstream cannot stretch one run indefinitely.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # The server did not process the request, so even a POST is safe to resend
+    UNPROCESSED_STATUSES = {429, 503}
+    IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+    def __init__(self, retry_config: Optional[Dict] = None):
+        retry_config = retry_config or {}
+        self.max_attempts = max(1, int(retry_config.get('max_attempts', 4)))
+        self.backoff = float(retry_config.get('backoff', 1))
+        self.max_backoff = float(retry_config.get('max_backoff', 30))
+        self.budget = int(retry_config.get('budget', 20))
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def should_retry(self, method: str, attempt: int, response: Optional[requests.Response] = None,
+                     error: Optional[Exception] = None) -> bool:
+        if attempt + 1 >= self.max_attempts:
+            return False
+        
+        if error is not None:
+            retryable = (
+                isinstance(error, requests.ConnectTimeout)
+                or (method in self.IDEMPOTENT_METHODS
+                    and isinstance(error, (requests.ConnectionError, requests.Timeout)))
+            )
+        elif method in self.IDEMPOTENT_METHODS:
+            retryable = response.status_code in self.RETRY_STATUSES
+        else:
+            retryable = response.status_code in self.UNPROCESSED_STATUSES
+        
+        if not retryable:
+            return False
+        
+        with self._lock:
+            if self.retries >= self.budget:
+                logger.warning("Retry budget exhausted for this run")
+                return False
+            self.retries += 1
+        return True
+
+    def delay(self, attempt: int, response: Optional[requests.Response] = None) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None if the server asks for too long"""
+        retry_after = self._retry_after(response) if response is not None else None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_backoff else None
+        
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HttpSessionPool:
+    """
+    Pooled keep-alive sessions, one per registered upstream
+    Upstreams are keyed by their full base URL, path included, so services
+    behind one reverse proxy (e.g. /radarr and /sonarr) keep their own
+    credentials. Unregistered URLs fall back to a session per host.
+    """
+
+    def __init__(self, http_config: Optional[Dict] = None):
+        http_config = http_config or {}
+        self.pool_size = int(http_config.get('pool_size', 10))
+        self.keep_alive = http_config.get('keep_alive', True)
+        self.max_per_host = int(http_config.get('max_per_host', self.pool_size))
+        self.default_headers = http_config.get('headers', {})
+        self.retry_policy = RetryPolicy(http_config.get('retry', {}))
+        self.budget: Optional[RunBudget] = None
+        self.sessions: Dict[str, requests.Session] = {}
+        self.upstream_defaults: Dict[str, Dict] = {}
+        self.upstream_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self.upstream_buckets: Dict[str, TokenBucket] = {}
+        self.upstream_breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        """Reduce a URL to the scheme://host[:port] its session is keyed by"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def upstream_key(self, url: str) -> str:
+        """The longest registered base URL the URL falls under, or its host"""
+        best = None
+        for base in self.upstream_defaults:
+            if url == base or url.startswith((f"{base}/", f"{base}?")):
+                if best is None or len(base) > len(best):
+                    best = base
+        return best or self.host_key(url)
+
+    def register(self, base_url: str, headers: Optional[Dict] = None, params: Optional[Dict] = None,
+                 max_concurrency: Optional[int] = None, rate_limit: Optional[Dict] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        """Set default headers/query params (e.g. API keys), concurrency cap, rate limit and breaker once for an upstream"""
+        key = base_url.rstrip('/')
+        with self._lock:
+            if breaker:
+                # Per service, so a dead Sonarr never trips Radarr behind the same proxy
+                self.upstream_breakers[key] = breaker
+            self.upstream_defaults[key] = {
+                'headers': headers or {},
+                'params': params or {}
+            }
+            if max_concurrency:
+                self.upstream_slots[key] = threading.BoundedSemaphore(int(max_concurrency))
+            if rate_limit:
+                rate = float(rate_limit['rate'])
+                self.upstream_buckets[key] = TokenBucket(rate, float(rate_limit.get('burst', rate)))
+            # Drop any session created before registration so defaults apply
+            session = self.sessions.pop(key, None)
+        if session:
+            session.close()
+
+    def session_for(self, url: str) -> requests.Session:
+        """Return the pooled session for the URL's upstream, creating it on first use"""
+        with self._lock:
+            key = self.upstream_key(url)
+            session = self.sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount(f"{key}/", adapter)
+                session.headers.update(self.default_headers)
+                defaults = self.upstream_defaults.get(key, {})
+                session.headers.update(defaults.get('headers', {}))
+                session.params.update(defaults.get('params', {}))
+                if not self.keep_alive:
+                    session.headers['Connection'] = 'close'
+                self.sessions[key] = session
+        return session
+
+    @contextmanager
+    def host_slot(self, url: str):
+        """Bound the number of in-flight requests against one upstream"""
+        with self._lock:
+            key = self.upstream_key(url)
+            slot = self.upstream_slots.get(key)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_per_host)
+                self.upstream_slots[key] = slot
+        with slot:
+            yield
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the host's rate limiter, retrying transient failures"""
+        session = self.session_for(url)
+        key = self.upstream_key(url)
+        bucket = self.upstream_buckets.get(key)
+        breaker = self.upstream_breakers.get(key)
+        policy = self.retry_policy
+        method = method.upper()
+        
+        if breaker and not breaker.allow():
+            raise CircuitOpenError(f"{breaker.name} circuit is open, skipping {urlsplit(url).path}")
+        
+        try:
+            response = self._send(session, method, url, bucket, policy, **kwargs)
+        except requests.RequestException as e:
+            if breaker:
+                if isinstance(e, requests.Timeout) and self.budget and self.budget.remaining() <= 0:
+                    # Cut short by our own deadline, not the upstream's fault
+                    breaker.release()
+                else:
+                    breaker.record_failure()
+            raise
+        except BaseException:
+            if breaker:
+                breaker.release()
+            raise
+        
+        if breaker:
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return response
+
+    def _send(self, session: requests.Session, method: str, url: str, bucket: Optional[TokenBucket],
+              policy: RetryPolicy, **kwargs) -> requests.Response:
+        attempt = 0
+        while True:
+            if bucket:
+                bucket.acquire()
+            if self.budget:
+                kwargs['timeout'] = self.budget.timeout()
+            
+            try:
+                with self.host_slot(url):
+                    response = session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                if not policy.should_retry(method, attempt, error=e):
+                    raise
+                delay = policy.delay(attempt)
+                if self.budget and delay >= self.budget.remaining():
+                    raise
+                logger.warning(f"{method} {urlsplit(url).path} failed ({e}), retrying in {delay:.1f}s")
+            else:
+                if (response.status_code not in policy.RETRY_STATUSES
+                        or not policy.should_retry(method, attempt, response=response)):
+                    return response
+                delay = policy.delay(attempt, response)
+                if delay is None or (self.budget and delay >= self.budget.remaining()):
+                    # Retry-After beyond our backoff ceiling or budget; let the caller handle the error
+                    return response
+                response.close()
+                logger.warning(
+                    f"{method} {urlsplit(url).path} returned {response.status_code}, "
+                    f"retrying in {delay:.1f}s"
+                )
+            
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def connection_stats(self) -> Dict[str, Dict[str, int]]:
+        """Count requests served per upstream and how many needed a new connection"""
+        stats = {}
+        with self._lock:
+            sessions = list(self.sessions.items())
+        for key, session in sessions:
+            adapter = session.get_adapter(f"{key}/")
+            pools = adapter.poolmanager.pools
+            new_connections = 0
+            total_requests = 0
+            for pool_key in list(pools.keys()):
+                pool = pools.get(pool_key)
+                if pool is None:
+                    continue
+                new_connections += pool.num_connections
+                total_requests += pool.num_requests
+            if not self.keep_alive:
+                # Connection: close forces a fresh handshake on every request
+                new_connections = total_requests
+            stats[key] = {
+                'requests': total_requests,
+                'new': new_connections,
+                'reused': max(0, total_requests - new_connections)
+            }
+        return stats
+
+    def log_stats(self):
+        """Log reused vs new connections and retries for this run"""
+        for host, counts in self.connection_stats().items():
+            logger.info(
+                f"HTTP {host}: {counts['requests']} requests, "
+                f"{counts['new']} new connections, {counts['reused']} reused"
+            )
+        policy = self.retry_policy
+        logger.info(f"HTTP retries: {policy.retries} of {policy.budget} budget used")
+
+    def close(self):
+        with self._lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+class ListItemStream:
+    """
+    Lazily pages through one MDBList list
+    Pages already fetched are kept, so iterating again starts from the first
+    item without new requests; a further page is only requested once
+    iteration runs past the items loaded so far.
+    """
+
+    def __init__(self, list_meta: Dict, fetch_page: Callable[[Dict, int, int], Tuple[List[Dict], bool]],
+                 page_size: int):
+        self.list_meta = list_meta
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.items: List[Dict] = []
+        self.pages_fetched = 0
+        self.exhausted = False
+        self._lock = threading.Lock()
+
+    def _load_next_page(self, loaded: int):
+        with self._lock:
+            # Another iterator may have loaded this page while we waited
+            if self.exhausted or len(self.items) > loaded:
+                return
+            page, has_more = self.fetch_page(self.list_meta, len(self.items), self.page_size)
+            self.items.extend(page)
+            self.pages_fetched += 1
+            if not has_more or not page:
+                self.exhausted = True
+
+    def prefetch(self):
+        """Load the first page ahead of iteration"""
+        if not self.items:
+            self._load_next_page(0)
+
+    def __iter__(self) -> Iterator[Dict]:
+        index = 0
+        while True:
+            if index < len(self.items):
+                yield self.items[index]
+                index += 1
+            elif self.exhausted:
+                return
+            else:
+                self._load_next_page(index)
+
+
+class SortedIdFile:
+    """
+    Sorted, packed 64-bit integer file, memory-mapped and binary-searched
+    The file is mapped read-only, so concurrent processes share its pages
+    and nothing is decoded at startup. Replace it with write(), never in place.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._mmap = None
+        self.ids = memoryview(b'').cast('q')
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.ids = memoryview(self._mmap).cast('q')
+
+    @staticmethod
+    def write(path: Path, ids: Iterable[int]):
+        """Atomically replace the file with the sorted, de-duplicated IDs"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        packed = array('q', sorted(set(ids)))
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            packed.tofile(f)
+        os.replace(tmp_path, path)
+
+    def __contains__(self, value) -> bool:
+        if not isinstance(value, int):
+            return False
+        index = bisect.bisect_left(self.ids, value)
+        return index < len(self.ids) and self.ids[index] == value
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids)
+
+
+class BloomFilter:
+    """
+    Compact probabilistic set of integers: never a false negative, tunable false-positive rate
+    A filter saved with write() is memory-mapped read-only by load(), so
+    like SortedIdFile it costs nothing to open and is never added to.
+    """
+
+    # The magic number changes with the hash scheme, so stale filters are rebuilt
+    MAGIC = b'SBF2'
+    HEADER = struct.Struct('<4sqq')
+    # Odd 64-bit constants for multiply-shift hashing of the IDs themselves
+    FIRST_MULTIPLIER = 0x9E3779B97F4A7C15
+    SECOND_MULTIPLIER = 0xC2B2AE3D27D4EB4F
+    MASK = (1 << 64) - 1
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        capacity = max(1, capacity)
+        false_positive_rate = min(max(false_positive_rate, 1e-9), 0.5)
+        self.size = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _hashes(self, value: int) -> Tuple[int, int]:
+        # Double hashing: the top 32 bits of two multiply-shift products, no digest needed
+        first = (value * self.FIRST_MULTIPLIER & self.MASK) >> 32
+        second = (value * self.SECOND_MULTIPLIER & self.MASK) >> 32 | 1
+        return first, second
+
+    def add(self, value: int):
+        first, second = self._hashes(value)
+        for i in range(self.hash_count):
+            position = (first + i * second) % self.size
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: int) -> bool:
+        first, second = self._hashes(value)
+        bits, size = self.bits, self.size
+        # Most misses stop at the first clear bit
+        for i in range(self.hash_count):
+            position = (first + i * second) % size
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+        return True
+
+    def write(self, path: Path):
+        """Atomically replace the file with this filter"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.size, self.hash_count))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'BloomFilter':
+        """Map a filter saved with write()"""
+        bloom = cls.__new__(cls)
+        with open(path, 'rb') as f:
+            bloom._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, bloom.size, bloom.hash_count = cls.HEADER.unpack_from(bloom._mmap)
+        bloom.bits = memoryview(bloom._mmap)[cls.HEADER.size:]
+        if (magic != cls.MAGIC or bloom.size <= 0 or bloom.hash_count <= 0
+                or len(bloom.bits) != (bloom.size + 7) // 8):
+            raise ValueError(f"{path} is not a Bloom filter")
+        return bloom
+
+
+class LibraryIndex:
+    """
+    Membership index of titles already in a library
+    Keyed by TMDB ID; Sonarr indexes also hold TVDB IDs because older
+    Sonarr versions only know series by TVDB ID. The base IDs are either a
+    set or a memory-mapped SortedIdFile; titles added since sit in a small
+    overlay set. An optional Bloom filter over the base TMDB IDs answers most
+    misses without touching them.
+    """
+
+    def __init__(self, tmdb_ids: Iterable[int] = (), tvdb_ids: Iterable[int] = ()):
+        self.tmdb_ids = tmdb_ids if isinstance(tmdb_ids, SortedIdFile) else set(tmdb_ids)
+        self.tvdb_ids = tvdb_ids if isinstance(tvdb_ids, SortedIdFile) else set(tvdb_ids)
+        self.added_tmdb_ids = set()
+        self.added_tvdb_ids = set()
+        self.excluded_tmdb_ids = set()
+        self.excluded_tvdb_ids = set()
+        self.bloom: Optional[BloomFilter] = None
+        self.bloom_stats = {'checks': 0, 'rejected': 0, 'false_positives': 0}
+
+    def exclude(self, tmdb_ids: Iterable[int] = (), tvdb_ids: Iterable[int] = ()):
+        """Treat titles excluded in Radarr/Sonarr as present so they are never requested"""
+        self.excluded_tmdb_ids.update(tmdb_ids)
+        self.excluded_tvdb_ids.update(tvdb_ids)
+
+    def __contains__(self, tmdb_id) -> bool:
+        # The overlay sets are small and not in the Bloom filter, so check them first
+        if tmdb_id in self.added_tmdb_ids or tmdb_id in self.excluded_tmdb_ids:
+            return True
+        if self.bloom is None or not isinstance(tmdb_id, int):
+            return tmdb_id in self.tmdb_ids
+        
+        self.bloom_stats['checks'] += 1
+        if tmdb_id not in self.bloom:
+            self.bloom_stats['rejected'] += 1
+            return False
+        
+        present = tmdb_id in self.tmdb_ids
+        if not present:
+            self.bloom_stats['false_positives'] += 1
+        return present
+
+    def __len__(self) -> int:
+        return len(self.tmdb_ids) + len(self.added_tmdb_ids)
+
+    def __iter__(self) -> Iterator[int]:
+        yield from self.tmdb_ids
+        yield from self.added_tmdb_ids
+
+    def contains_tvdb(self, tvdb_id) -> bool:
+        return tvdb_id in self.added_tvdb_ids or tvdb_id in self.excluded_tvdb_ids or tvdb_id in self.tvdb_ids
+
+    def add(self, tmdb_id: Optional[int], tvdb_id: Optional[int] = None):
+        if tmdb_id is not None and tmdb_id not in self.added_tmdb_ids and tmdb_id not in self.tmdb_ids:
+            self.added_tmdb_ids.add(tmdb_id)
+        if tvdb_id is not None and not self.contains_tvdb(tvdb_id):
+            self.added_tvdb_ids.add(tvdb_id)
+
+    def log_bloom_stats(self, name: str):
+        if self.bloom is None:
+            return
+        stats = self.bloom_stats
+        logger.info(
+            f"{name} Bloom filter: {stats['checks']} checks, {stats['rejected']} rejected without lookup, "
+            f"{stats['false_positives']} false positives ({len(self.bloom.bits)} bytes)"
+        )
+
+
+class ListResponseCache:
+    """
+    On-disk cache of MDBList responses
+    Bodies are stored gzip-compressed with their ETag/Last-Modified so stale
+    entries can be revalidated with a conditional request. Entries younger
+    than max_age are served without any request at all.
+    """
+
+    def __init__(self, cache_dir: Path, max_age: timedelta, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(url.encode()).hexdigest()}.json.gz"
+
+    def load(self, url: str) -> Optional[Dict]:
+        """Return the cached entry for a URL, or None"""
+        path = self._path(url)
+        try:
+            with gzip.open(path, 'rt') as f:
+                entry = json.load(f)
+            # Reading counts as use for eviction purposes
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def is_fresh(self, entry: Dict) -> bool:
+        fetched_at = datetime.fromisoformat(entry['fetched_at'])
+        return datetime.now() - fetched_at < self.max_age
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict:
+        """Build If-None-Match/If-Modified-Since headers for a cached entry"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url: str, response: requests.Response, body):
+        """Write a fresh response to disk"""
+        entry = {
+            'fetched_at': datetime.now().isoformat(),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'has_more': response.headers.get('X-Has-More'),
+            'body': body
+        }
+        self._write(url, entry)
+
+    def refresh(self, url: str, entry: Dict):
+        """Restart the max-age clock of an entry the server confirmed unchanged"""
+        entry['fetched_at'] = datetime.now().isoformat()
+        self._write(url, entry)
+
+    def _write(self, url: str, entry: Dict):
+        path = self._path(url)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            with gzip.open(tmp_path, 'wt') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write cache entry {path.name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def record(self, outcome: str):
+        """Count a 'hit', 'revalidated' or 'miss'"""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        entries = []
+        for path in self.cache_dir.glob('*.json.gz'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def log_stats(self):
+        logger.info(
+            f"List cache: {self.hits + self.revalidated} hits "
+            f"({self.hits} fresh, {self.revalidated} revalidated), {self.misses} misses"
+        )
+
+
+class NegativeCache:
+    """
+    Persistent record of candidates that recently failed for a lasting reason
+    Entries are keyed by (service, TMDB ID, reason) and expire after the TTL
+    configured for that reason, so a title Radarr cannot find or refuses to
+    add is skipped without a request until the TTL runs out.
+    """
+
+    def __init__(self, path: Path, ttls: Dict[str, float]):
+        self.path = path
+        self.ttls = ttls
+        self.skipped = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        now = time.time()
+        self.entries: Dict[str, float] = {
+            key: expires_at
+            for key, expires_at in load_json_state(path, {}).items()
+            if expires_at > now
+        }
+
+    @staticmethod
+    def _key(service: str, tmdb_id, reason: str) -> str:
+        return f"{service}:{tmdb_id}:{reason}"
+
+    def blocked(self, service: str, tmdb_id) -> Optional[str]:
+        """Return the reason a candidate is still blocked, or None"""
+        now = time.time()
+        for reason in self.ttls:
+            if self.entries.get(self._key(service, tmdb_id, reason), 0) > now:
+                with self._lock:
+                    self.skipped += 1
+                return reason
+        return None
+
+    def record(self, service: str, tmdb_id, reason: str):
+        """Block a candidate for the TTL of its failure class"""
+        ttl = self.ttls.get(reason, 0)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self.entries[self._key(service, tmdb_id, reason)] = time.time() + ttl
+            self.recorded += 1
+
+    def save(self):
+        now = time.time()
+        with self._lock:
+            entries = {key: expires_at for key, expires_at in self.entries.items() if expires_at > now}
+        save_json_state(self.path, entries)
+
+    def log_stats(self):
+        logger.info(
+            f"Negative cache: {self.skipped} candidates skipped, "
+            f"{self.recorded} newly recorded, {len(self.entries)} entries"
+        )
+
+
+class LookupCache:
+    """
+    Persistent LRU cache of Radarr/Sonarr lookup results
+    Only the fields the add payloads need are kept. Entries expire after
+    max_age and the least recently used are dropped beyond max_entries.
+    """
+
+    def __init__(self, path: Path, max_entries: int, max_age: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.entries: OrderedDict = OrderedDict(load_json_state(path, {}))
+
+    def get(self, service: str, tmdb_id) -> Optional[Dict]:
+        key = f"{service}:{tmdb_id}"
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or time.time() - entry['fetched_at'] >= self.max_age:
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry['data'])
+
+    def put(self, service: str, tmdb_id, data: Dict):
+        key = f"{service}:{tmdb_id}"
+        with self._lock:
+            self.entries[key] = {'fetched_at': time.time(), 'data': data}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def save(self):
+        with self._lock:
+            entries = dict(self.entries)
+        save_json_state(self.path, entries)
+
+    def log_stats(self):
+        logger.info(f"Lookup cache: {self.hits} hits, {self.misses} misses, {len(self.entries)} entries")
+
+
+class AddOutbox:
+    """
+    Durable record of adds that were attempted but not confirmed
+    An entry is written before the add request and removed once Radarr or
+    Sonarr accepts or definitively rejects it, so adds lost to a transient
+    error or a killed process can be replayed by the next run.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = load_json_state(path, {})
+
+    @staticmethod
+    def _key(service: str, data: Dict) -> str:
+        # Series from older Sonarr lookups may lack a TMDB ID
+        return f"{service}:{data.get('tmdbId') or data.get('tvdbId')}"
+
+    def put(self, service: str, data: Dict, list_meta: Dict):
+        """Record an add about to be attempted"""
+        key = self._key(service, data)
+        with self._lock:
+            previous = self.entries.get(key, {})
+            self.entries[key] = {
+                'service': service,
+                'data': data,
+                'list': list_meta,
+                'created_at': previous.get('created_at', time.time()),
+                'attempts': previous.get('attempts', 0) + 1
+            }
+            save_json_state(self.path, self.entries)
+
+    def resolve(self, service: str, data: Dict):
+        """Drop an entry whose add succeeded or was rejected for good"""
+        with self._lock:
+            if self.entries.pop(self._key(service, data), None) is not None:
+                save_json_state(self.path, self.entries)
+
+    def pending(self, service: str) -> List[Dict]:
+        with self._lock:
+            return [entry for entry in self.entries.values() if entry['service'] == service]
+
+
+class RunJournal:
+    """
+    Write-ahead journal of the current run's checkpoints
+    Each record is appended as a JSON line and fsynced before the run moves
+    on. A run that was killed leaves a journal without a 'finished' record,
+    which the next run can resume from.
+    """
+
+    def __init__(self, path: Path, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self) -> List[Dict]:
+        """Records of the previous run, ignoring a torn final line"""
+        records = []
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+        except FileNotFoundError:
+            pass
+        return records
+
+    def open(self, resume: bool):
+        """Start a new journal, or keep appending to the interrupted one"""
+        if not self.enabled:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w')
+        if not resume:
+            self.record('started')
+
+    def record(self, event: str, **data):
+        if self._file is None:
+            return
+        line = json.dumps({'event': event, 'at': time.time(), **data})
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record_phase(self, label: str, seconds: float):
+        self.record('phase', label=label, seconds=round(seconds, 3))
+
+    def close(self, finished: bool):
+        """Close the journal, marking the run finished so it is never resumed"""
+        if self._file is None:
+            return
+        if finished:
+            self.record('finished')
+        self._file.close()
+        self._file = None
+
+
+class MoviePlan:
+    """
+    Ranked movie candidates chosen from all lists before any add is made
+    Each entry keeps the parts of its score so the choice can be explained.
+    """
+
+    def __init__(self, entries: List[Dict], scanned: int, duplicates: int, filtered: int):
+        self.entries = entries
+        self.scanned = scanned
+        self.duplicates = duplicates
+        self.filtered = filtered
+
+    def candidates(self) -> List[Tuple[Dict, Dict]]:
+        return [(entry['item'], entry['list']) for entry in self.entries]
+
+    def explain(self):
+        logger.info(
+            f"Movie plan: {len(self.entries)} candidates from {self.scanned} items "
+            f"({self.duplicates} duplicates merged, {self.filtered} already present or blocked)"
+        )
+        for position, entry in enumerate(self.entries, 1):
+            also = f", also in {', '.join(entry['also_in'])}" if entry['also_in'] else ""
+            logger.info(
+                f"  {position}. {entry['item'].get('title') or 'Unknown'} (TMDB {entry['item']['id']}) "
+                f"score {entry['score']:.3f}: list {entry['list']['name']} priority {entry['priority']:g}, "
+                f"rank {entry['rank']}, rotation +{entry['rotation']}{also}"
+            )
+
+
+class ListRotation:
+    """
+    Weighted deficit round-robin over configured lists, persisted across runs
+    Every slot handed out earns each list credit equal to its weight, and a
+    list is charged the total weight for each slot it uses. The list with the
+    most credit goes next, so over many runs each list gets its weighted share
+    of slots however many lists there are.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.credits: Dict[str, Dict[str, float]] = load_json_state(path, {})
+        self.weights: Dict[str, Dict[str, float]] = {}
+        self.scheduled: Dict[str, Dict[str, int]] = {}
+        self.adds: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _weights(lists: List[Dict]) -> Dict[str, float]:
+        weights = {str(list_meta['id']): max(0.0, float(list_meta.get('weight', 1))) for list_meta in lists}
+        if not any(weights.values()):
+            weights = dict.fromkeys(weights, 1.0)
+        return weights
+
+    def schedule(self, kind: str, lists: List[Dict], slots: int, reserve: bool = True) -> List[Dict]:
+        """
+        Order `slots` list slots for this run, starting from the saved credits
+        With reserve=False the order is only advisory: lists are charged for
+        what they add, not for the slots they were given.
+        """
+        weights = self._weights(lists)
+        total_weight = sum(weights.values())
+        saved = self.credits.get(kind, {})
+        credits = {list_id: saved.get(list_id, 0.0) for list_id in weights}
+        
+        order = []
+        scheduled = dict.fromkeys(weights, 0)
+        for _ in range(slots):
+            for list_id, weight in weights.items():
+                credits[list_id] += weight
+            # max() keeps the first configured list on ties
+            chosen = max(lists, key=lambda list_meta: credits[str(list_meta['id'])])
+            credits[str(chosen['id'])] -= total_weight
+            scheduled[str(chosen['id'])] += 1
+            order.append(chosen)
+        
+        self.weights[kind] = weights
+        self.scheduled[kind] = scheduled if reserve else dict.fromkeys(weights, 0)
+        return order
+
+    def record_add(self, kind: str, list_id):
+        with self._lock:
+            adds = self.adds.setdefault(kind, {})
+            adds[str(list_id)] = adds.get(str(list_id), 0) + 1
+
+    def save(self):
+        """Charge each list for the slots it used this run and persist the credits"""
+        if not self.scheduled:
+            return
+        
+        for kind, weights in self.weights.items():
+            scheduled = self.scheduled[kind]
+            adds = self.adds.get(kind, {})
+            # A list is charged for its slots even if they yielded nothing, so it cannot stall the rotation
+            usage = {list_id: max(scheduled[list_id], adds.get(list_id, 0)) for list_id in weights}
+            used = sum(usage.values())
+            total_weight = sum(weights.values())
+            saved = self.credits.get(kind, {})
+            self.credits[kind] = {
+                list_id: round(saved.get(list_id, 0.0) + weight * used - total_weight * usage[list_id], 6)
+                for list_id, weight in weights.items()
+            }
+        
+        save_json_state(self.path, self.credits)
+
 
 class MediaSyncManager:
     def __init__(self, config_path: str = "config.json"):
         """Initialize the manager with config file path"""
         self.config_path = Path(config_path)
         self.config = self.load_config()
-        self.current_hour = datetime.now().hour
+        self.state_dir = Path(self.config.get('state_dir', self.config_path.parent / '.schedularr'))
+        self.http = HttpSessionPool(self.config.get('http', {}))
+        self.breakers = self._load_breakers()
+        self._register_upstreams()
+        self.list_cache = self._create_list_cache()
+        self.journal = RunJournal(
+            self.state_dir / 'journal.jsonl', self.config.get('journal', {}).get('enabled', True)
+        )
+        self.resume: Dict = {}
+        self.rotation = ListRotation(self.state_dir / 'rotation.json')
+        self.negative_cache = self._create_negative_cache()
+        self.lookup_cache = self._create_lookup_cache()
+        self.budget = self._create_budget()
+        self.http.budget = self.budget
+        self.added = {'movies': 0, 'shows': 0}
+        self.library_indexes: Dict[str, Dict] = {}
+        self.libraries: Dict[str, LibraryIndex] = {}
+        self.fast_add = self.config.get('radarr', {}).get('fast_add', True)
+        self.fast_add_stats = {'added': 0, 'fallbacks': 0}
+        self.series_resolution = {'item': 0, 'cache': 0, 'lookup': 0}
+        self.deferred_search = self.config.get('search', {}).get('deferred', False)
+        self.pending_searches = load_json_state(
+            self.state_dir / 'pending_searches.json', {'radarr': [], 'sonarr': []}
+        )
+        self._search_lock = threading.Lock()
+        self.outbox = AddOutbox(self.state_dir / 'outbox.json') if self.config.get('outbox', {}).get('enabled', True) else None
+        self.batch_add = self.config.get('radarr', {}).get('batch_add', False)
+        self.lookahead = int(self.config.get('radarr', {}).get('lookahead', 0))
+        self.planner = self.config.get('planner', {}).get('enabled', False)
         
     def load_config(self) -> dict:
         """Load configuration from JSON file"""
@@ -37,6 +1333,150 @@ class MediaSyncManager:
             logger.error(f"Failed to load config: {e}")
             raise
     
+    def _register_upstreams(self):
+        """Attach each upstream's credentials and rate limit to its pooled session once"""
+        rate_limits = self.config.get('http', {}).get('rate_limits', {})
+        
+        if 'rd' in self.config:
+            self.http.register(
+                RD_API_URL,
+                headers={"Authorization": f"Bearer {self.config['rd']['token']}"},
+                rate_limit=rate_limits.get('rd'),
+                breaker=self.breakers['rd']
+            )
+        if 'mdbList' in self.config:
+            self.http.register(
+                MDBLIST_API_URL,
+                params={"apikey": self.config['mdbList']['api_key']},
+                max_concurrency=self.config['mdbList'].get('max_concurrency', 4),
+                rate_limit=rate_limits.get('mdbList'),
+                breaker=self.breakers['mdbList']
+            )
+        for service in ('radarr', 'sonarr'):
+            if service in self.config:
+                self.http.register(
+                    self._service_url(service, ''),
+                    headers={"X-Api-Key": self.config[service]['api_key']},
+                    rate_limit=rate_limits.get(service),
+                    breaker=self.breakers[service]
+                )
+    
+    def _load_breakers(self) -> Dict[str, CircuitBreaker]:
+        """Restore each upstream's circuit breaker from the previous run"""
+        breaker_config = self.config.get('circuit_breaker', {})
+        threshold = int(breaker_config.get('failure_threshold', 3))
+        cooldown = self._parse_duration(breaker_config.get('cooldown', '10m')).total_seconds()
+        saved = load_json_state(self.state_dir / 'circuit_breakers.json', {})
+        
+        return {
+            service: CircuitBreaker(service, threshold, cooldown, saved.get(service))
+            for service in ('rd', 'mdbList', 'radarr', 'sonarr')
+        }
+    
+    def save_breakers(self):
+        save_json_state(
+            self.state_dir / 'circuit_breakers.json',
+            {service: breaker.to_dict() for service, breaker in self.breakers.items()}
+        )
+
+    def _create_list_cache(self) -> Optional[ListResponseCache]:
+        """Set up the on-disk MDBList cache unless disabled"""
+        cache_config = self.config.get('mdbList', {}).get('cache', {})
+        if not cache_config.get('enabled', True):
+            return None
+        
+        return ListResponseCache(
+            Path(cache_config.get('dir', self.state_dir / 'list_cache')),
+            self._parse_duration(cache_config.get('max_age', '15m')),
+            int(float(cache_config.get('max_size_mb', 50)) * 1024 * 1024)
+        )
+
+    NEGATIVE_CACHE_TTLS = {
+        'not_found': '7d',
+        'rejected': '24h'
+    }
+    
+    def _create_negative_cache(self) -> NegativeCache:
+        """Load the negative cache with a TTL per failure class"""
+        cache_config = self.config.get('negative_cache', {})
+        ttls = {}
+        if cache_config.get('enabled', True):
+            configured = {**self.NEGATIVE_CACHE_TTLS, **cache_config.get('ttl', {})}
+            ttls = {
+                reason: self._parse_duration(duration).total_seconds()
+                for reason, duration in configured.items()
+            }
+        return NegativeCache(self.state_dir / 'negative_cache.json', ttls)
+    
+    def _create_lookup_cache(self) -> Optional[LookupCache]:
+        """Load the persistent lookup cache unless disabled"""
+        cache_config = self.config.get('lookup_cache', {})
+        if not cache_config.get('enabled', True):
+            return None
+        
+        return LookupCache(
+            self.state_dir / 'lookup_cache.json',
+            int(cache_config.get('max_entries', 5000)),
+            self._parse_duration(cache_config.get('max_age', '30d')).total_seconds()
+        )
+    
+    # Lookup fields kept in the cache, i.e. everything the add payloads use
+    LOOKUP_FIELDS = {
+        'radarr': ('tmdbId', 'title'),
+        'sonarr': ('tmdbId', 'tvdbId', 'title')
+    }
+    
+    def lookup(self, service: str, path: str, tmdb_id: int, use_cache: bool = True) -> Optional[Dict]:
+        """Look up a title by TMDB ID, answering from the lookup cache when possible"""
+        if use_cache and self.lookup_cache:
+            cached = self.lookup_cache.get(service, tmdb_id)
+            if cached:
+                return cached
+        
+        response = self.http.get(self._service_url(service, f"{path}?term=tmdb%3A{tmdb_id}"))
+        response.raise_for_status()
+        results = response.json()
+        if not results:
+            self.negative_cache.record(service, tmdb_id, 'not_found')
+            return None
+        
+        data = {field: results[0].get(field) for field in self.LOOKUP_FIELDS[service]}
+        if self.lookup_cache:
+            self.lookup_cache.put(service, tmdb_id, data)
+        return data
+    
+    @staticmethod
+    def _is_rejection(error: Exception) -> bool:
+        """Whether an add failed because of the request itself rather than a transient fault"""
+        if not isinstance(error, requests.HTTPError) or error.response is None:
+            return False
+        status = error.response.status_code
+        # Auth failures and throttling say nothing about the candidate
+        return 400 <= status < 500 and status not in (401, 403, 408, 429)
+    
+    def _create_budget(self) -> RunBudget:
+        """Build the run deadline and phase sub-budgets from config"""
+        run_config = self.config.get('run', {})
+        phases = {
+            name: self._parse_duration(duration).total_seconds()
+            for name, duration in run_config.get('phases', {}).items()
+        }
+        return RunBudget(
+            self._parse_duration(run_config.get('deadline', '5m')).total_seconds(),
+            phases,
+            self._parse_duration(run_config.get('request_timeout', '30s')).total_seconds(),
+            self.journal.record_phase
+        )
+
+    def _service_url(self, service: str, path: str) -> str:
+        """Build a Radarr/Sonarr URL with the optional port"""
+        base_url = self.config[service]['base_url']
+        port = self.config[service].get('port')
+        
+        if port:
+            return f"{base_url}:{port}{path}"
+        return f"{base_url}{path}"
+
     def save_config(self):
         """Save updated configuration back to file"""
         try:
@@ -187,13 +1627,10 @@ class MediaSyncManager:
 
     def get_rd_active_count(self) -> Dict:
         """Get active torrents count from Real-Debrid"""
-        url = "https://api.real-debrid.com/rest/1.0/torrents/activeCount"
-        headers = {
-            "Authorization": f"Bearer {self.config['rd']['token']}"
-        }
+        url = f"{RD_API_URL}/rest/1.0/torrents/activeCount"
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self.http.get(url)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -223,129 +1660,710 @@ class MediaSyncManager:
         logger.info(f"Download capacity - Movies: {total_movie_ddl}, Shows: {total_show_ddl}")
         return total_movie_ddl, total_show_ddl
     
-    def get_list_items(self, list_meta: Dict) -> List[Dict]:
-        """Fetch items from a MDBlist"""
-        apiKey = self.config['mdbList']['api_key']
-        url = f"https://api.mdblist.com/lists/{list_meta['id']}/items?apikey={apiKey}&unified=true"
+    def get_list_page(self, list_meta: Dict, offset: int, limit: int) -> Tuple[List[Dict], bool]:
+        """Fetch one page of a MDBlist, returning the items and whether more remain"""
+        url = f"{MDBLIST_API_URL}/lists/{list_meta['id']}/items?unified=true&limit={limit}&offset={offset}"
+        cache = self.list_cache
+        cached = cache.load(url) if cache else None
+        
+        if cached and cache.is_fresh(cached):
+            cache.record('hits')
+            return cached['body'], self._has_more(cached['has_more'], cached['body'], limit)
         
         try:
-            response = requests.get(url)
+            response = self.http.get(url, headers=ListResponseCache.conditional_headers(cached))
+            if cached and response.status_code == 304:
+                cache.record('revalidated')
+                cache.refresh(url, cached)
+                return cached['body'], self._has_more(cached['has_more'], cached['body'], limit)
             response.raise_for_status()
-            return response.json()
+            items = response.json()
         except Exception as e:
             logger.error(f"Failed to get MDBlist list {list_meta['name']}: {e}")
-            return []
+            return [], False
+        
+        if cache:
+            cache.record('misses')
+            cache.store(url, response, items)
+        return items, self._has_more(response.headers.get('X-Has-More'), items, limit)
+    
+    @staticmethod
+    def _has_more(header: Optional[str], items: List[Dict], limit: int) -> bool:
+        """Decide whether a list has further pages"""
+        if header is not None:
+            return header.lower() == 'true'
+        return len(items) >= limit
+    
+    def stream_list_items(self, list_meta: Dict) -> ListItemStream:
+        """Lazily page through a MDBlist"""
+        page_size = int(self.config.get('mdbList', {}).get('page_size', 250))
+        return ListItemStream(list_meta, self.get_list_page, max(1, page_size))
+    
+    def stream_library(self, service: str, path: str, fields: Tuple[str, ...]) -> Iterator[Tuple]:
+        """
+        Stream a Radarr/Sonarr library, yielding only the requested fields
+        The body is downloaded compressed and decoded in chunks, so memory
+        stays flat regardless of library size.
+        """
+        url = self._service_url(service, path)
+        chunk_size = int(self.config.get(service, {}).get('library_chunk_size', 65536))
+        
+        with self.http.get(url, stream=True, headers={"Accept-Encoding": "gzip, deflate"}) as response:
+            response.raise_for_status()
+            for record in iter_json_array(response.iter_content(chunk_size)):
+                yield tuple(record.get(field) for field in fields)
+    
+    LIBRARY_PATHS = {
+        'radarr': "/api/v3/movie",
+        'sonarr': "/api/v3/series"
+    }
+    
+    def fetch_library(self, service: str) -> Dict[str, List[int]]:
+        """Download a full library's TMDB IDs (and TVDB IDs for Sonarr); raises on failure"""
+        tmdb_ids = []
+        tvdb_ids = []
+        for tmdb_id, tvdb_id in self.stream_library(service, self.LIBRARY_PATHS[service], ('tmdbId', 'tvdbId')):
+            if tmdb_id is not None:
+                tmdb_ids.append(tmdb_id)
+            if tvdb_id is not None and service == 'sonarr':
+                tvdb_ids.append(tvdb_id)
+        return {'tmdb_ids': tmdb_ids, 'tvdb_ids': tvdb_ids}
+    
+    def _library_paths(self, service: str) -> Tuple[Path, Path, Path, Path]:
+        """Metadata, TMDB ID, TVDB ID and Bloom filter files of a service's library index"""
+        return (
+            self.state_dir / f"library_{service}.json",
+            self.state_dir / f"library_{service}.tmdb.idx",
+            self.state_dir / f"library_{service}.tvdb.idx",
+            self.state_dir / f"library_{service}.bloom"
+        )
+    
+    def _bloom_rate(self) -> Optional[float]:
+        """Configured Bloom filter false-positive rate, or None when the filter is off"""
+        bloom_config = self.config.get('library', {}).get('bloom', {})
+        if not bloom_config.get('enabled', False):
+            return None
+        return float(bloom_config.get('false_positive_rate', 0.01))
+    
+    def write_library_bloom(self, service: str, saved: Dict, tmdb_ids: Iterable[int], false_positive_rate: float):
+        """Build the Bloom filter over a library index's TMDB IDs and save it next to the index"""
+        tmdb_ids = [tmdb_id for tmdb_id in tmdb_ids if isinstance(tmdb_id, int)]
+        bloom = BloomFilter(len(tmdb_ids), false_positive_rate)
+        for tmdb_id in tmdb_ids:
+            bloom.add(tmdb_id)
+        bloom.write(self._library_paths(service)[3])
+        # Recorded in the metadata, which a refresh replaces, so a filter never outlives its index
+        saved['bloom_false_positive_rate'] = false_positive_rate
+    
+    def load_library_bloom(self, service: str, saved: Dict, tmdb_ids: SortedIdFile,
+                           false_positive_rate: float) -> BloomFilter:
+        """
+        Map the saved Bloom filter of a library index
+        It is built when the index is refreshed; a missing or unreadable
+        filter, or one built for another false-positive rate, is rebuilt once.
+        """
+        bloom_path = self._library_paths(service)[3]
+        if saved.get('bloom_false_positive_rate') == false_positive_rate:
+            try:
+                return BloomFilter.load(bloom_path)
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning(f"Failed to load {service} Bloom filter, rebuilding it: {e}")
+        
+        self.write_library_bloom(service, saved, tmdb_ids, false_positive_rate)
+        save_json_state(self._library_paths(service)[0], saved)
+        return BloomFilter.load(bloom_path)
     
-    def get_radarr_existing_movies(self) -> List[int]:
-        """Get list of existing TMDB IDs from Radarr"""
-        base_url = self.config['radarr']['base_url']
-        port = self.config['radarr'].get('port')
-        api_key = self.config['radarr']['api_key']
+    def load_library(self, service: str) -> LibraryIndex:
+        """
+        Existing TMDB IDs from the on-disk library index
+        The index is seeded from a full library download, kept current by
+        recording our own adds, and only re-downloaded once it is older than
+        library.refresh_interval. IDs live in sorted packed files that are
+        memory-mapped, so startup decodes nothing and concurrent processes
+        share the pages.
+        """
+        meta_path, tmdb_path, tvdb_path, _ = self._library_paths(service)
+        false_positive_rate = self._bloom_rate()
+        interval = self._parse_duration(
+            self.config.get('library', {}).get('refresh_interval', '24h')
+        ).total_seconds()
+        saved = load_json_state(meta_path, None)
+        if saved and not (tmdb_path.exists() and tvdb_path.exists()):
+            saved = None
         
-        # Build URL with optional port
-        if port:
-            url = f"{base_url}:{port}/api/v3/movie"
+        if saved and service in self.resume.get('libraries', ()):
+            logger.info(f"Using {service} library index loaded by the interrupted run")
+        elif saved and time.time() - saved['refreshed_at'] < interval:
+            logger.info(f"Using {service} library index")
         else:
-            url = f"{base_url}/api/v3/movie"
+            try:
+                library = self.fetch_library(service)
+                SortedIdFile.write(tmdb_path, library['tmdb_ids'])
+                SortedIdFile.write(tvdb_path, library['tvdb_ids'])
+                saved = {'refreshed_at': time.time(), 'added_tmdb_ids': [], 'added_tvdb_ids': []}
+                if false_positive_rate is not None:
+                    self.write_library_bloom(service, saved, library['tmdb_ids'], false_positive_rate)
+                save_json_state(meta_path, saved)
+                logger.info(f"Refreshed {service} library index from full download")
+            except Exception as e:
+                if not saved:
+                    logger.error(f"Failed to get {service} library: {e}")
+                    self.libraries[service] = LibraryIndex()
+                    return self.libraries[service]
+                logger.warning(f"Failed to refresh {service} library, using stale index: {e}")
+        
+        self.library_indexes[service] = saved
+        index = LibraryIndex(SortedIdFile(tmdb_path), SortedIdFile(tvdb_path))
+        for tmdb_id in saved.get('added_tmdb_ids', []):
+            index.add(tmdb_id)
+        for tvdb_id in saved.get('added_tvdb_ids', []):
+            index.add(None, tvdb_id)
+        index.exclude(**self.load_exclusions(service))
+        if false_positive_rate is not None:
+            index.bloom = self.load_library_bloom(service, saved, index.tmdb_ids, false_positive_rate)
+        self.libraries[service] = index
+        self.journal.record('library', service=service)
+        return index
+    
+    EXCLUSION_PATHS = {
+        'radarr': ("/api/v3/exclusions", 'tmdbId', 'tmdb_ids'),
+        'sonarr': ("/api/v3/importlistexclusion", 'tvdbId', 'tvdb_ids')
+    }
+    
+    def load_exclusions(self, service: str) -> Dict[str, List[int]]:
+        """
+        IDs the user excluded in Radarr (by TMDB ID) or Sonarr (by TVDB ID)
+        Cached in the state directory for exclusions.max_age so most runs
+        need no request.
+        """
+        exclusion_config = self.config.get('exclusions', {})
+        if not exclusion_config.get('enabled', True):
+            return {}
         
-        headers = {"X-Api-Key": api_key}
+        path = self.state_dir / f"exclusions_{service}.json"
+        max_age = self._parse_duration(exclusion_config.get('max_age', '6h')).total_seconds()
+        endpoint, field, key = self.EXCLUSION_PATHS[service]
+        saved = load_json_state(path, None)
         
+        if not saved or time.time() - saved['fetched_at'] >= max_age:
+            try:
+                response = self.http.get(self._service_url(service, endpoint))
+                response.raise_for_status()
+                ids = [exclusion[field] for exclusion in response.json() if exclusion.get(field) is not None]
+                saved = {'fetched_at': time.time(), 'ids': ids}
+                save_json_state(path, saved)
+            except Exception as e:
+                logger.warning(f"Failed to get {service} exclusions: {e}")
+                if not saved:
+                    return {}
+        
+        logger.info(f"Skipping {len(saved['ids'])} titles excluded in {service}")
+        return {key: saved['ids']}
+    
+    def record_library_add(self, service: str, tmdb_id: Optional[int], tvdb_id: Optional[int] = None):
+        """Add a title we just added to the on-disk library index"""
+        meta_path = self._library_paths(service)[0]
+        saved = self.library_indexes.get(service)
+        if saved is None:
+            # Not loaded this run (e.g. an outbox replay used all capacity); update the saved index
+            saved = load_json_state(meta_path, None)
+        if saved is None:
+            # No trustworthy index yet; the next full download will pick it up
+            return
+        if tmdb_id is not None:
+            saved['added_tmdb_ids'].append(tmdb_id)
+        if tvdb_id is not None:
+            saved['added_tvdb_ids'].append(tvdb_id)
+        save_json_state(meta_path, saved)
+    
+    def radarr_lookup_movie(self, tmdb_id: int) -> Optional[Dict]:
+        """Look up movie details in Radarr by TMDB ID"""
+        try:
+            return self.lookup('radarr', "/api/v3/movie/lookup", tmdb_id)
+        except Exception as e:
+            logger.error(f"Failed to lookup movie {tmdb_id}: {e}")
+            return None
+    
+    def _movie_payload(self, movie_data: Dict, list_meta: Dict) -> Dict:
+        return {
+            "tmdbId": movie_data['tmdbId'],
+            "title": movie_data.get('title'),
+            "qualityProfileId": list_meta['qualityProfileId'],
+            "rootFolderPath": list_meta['rootFolderPath'],
+            "addOptions": {
+                "monitor": "movieOnly",
+                "searchForMovie": not self.deferred_search
+            }
+        }
+    
+    def _post_movie(self, movie_data: Dict, list_meta: Dict):
+        """POST a movie to Radarr, raising on failure"""
+        url = self._service_url('radarr', "/api/v3/movie")
+        if self.outbox:
+            self.outbox.put('radarr', movie_data, list_meta)
+        
+        try:
+            response = self.http.post(url, json=self._movie_payload(movie_data, list_meta))
+            response.raise_for_status()
+        except Exception as e:
+            # Transient failures stay in the outbox for the next run
+            if self.outbox and self._is_rejection(e):
+                self.outbox.resolve('radarr', movie_data)
+            raise
+        
+        if self.outbox:
+            self.outbox.resolve('radarr', movie_data)
+        self.queue_search('radarr', response.json())
+    
+    def radarr_add_movie(self, movie_data: Dict, list_meta: Dict) -> bool:
+        """Add a movie to Radarr"""
+        try:
+            self._post_movie(movie_data, list_meta)
+            logger.info(f"Added movie: {movie_data.get('title', 'Unknown')}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to add movie: {e}")
+            if self._is_rejection(e):
+                self.negative_cache.record('radarr', movie_data['tmdbId'], 'rejected')
+            return False
+    
+    def radarr_fast_add_movie(self, item: Dict, list_meta: Dict) -> Optional[bool]:
+        """
+        Add a movie straight from its MDBList item, without a lookup
+        Returns None when Radarr rejected the bare payload, so the caller
+        can retry with a looked-up one.
+        """
+        movie_data = {'tmdbId': item['id'], 'title': item.get('title')}
+        
+        try:
+            self._post_movie(movie_data, list_meta)
+            logger.info(f"Added movie: {movie_data['title'] or 'Unknown'}")
+            self.fast_add_stats['added'] += 1
+            return True
+        except Exception as e:
+            if not self._is_rejection(e):
+                # Outages, timeouts and open breakers would fail the lookup too
+                logger.error(f"Failed to add movie: {e}")
+                return False
+            # Not recorded in the negative cache; the full add decides that
+            logger.info(f"Direct add of movie {item['id']} was rejected, falling back to lookup: {e}")
+            self.fast_add_stats['fallbacks'] += 1
+            return None
+    
+    def add_movie_item(self, item: Dict, list_meta: Dict) -> bool:
+        """Add one candidate, trying the lookup-free path first when enabled"""
+        if self.fast_add:
+            added = self.radarr_fast_add_movie(item, list_meta)
+            if added is not None:
+                return added
+        
+        movie_data = self.radarr_lookup_movie(item['id'])
+        if not movie_data or not self.radarr_add_movie(movie_data, list_meta):
+            return False
+        
+        if self.fast_add:
+            # Radarr wants the looked-up payload, so stop trying direct adds
+            logger.warning("Radarr only accepted the movie after lookup; disabling direct adds for this run")
+            self.fast_add = False
+        return True
+    
+    def radarr_import_movies(self, candidates: List[Tuple[Dict, Dict]]) -> set:
+        """Add several movies with one bulk import request; returns the TMDB IDs Radarr added"""
+        payloads = []
+        for item, list_meta in candidates:
+            if self.fast_add:
+                movie_data = {'tmdbId': item['id'], 'title': item.get('title')}
+            else:
+                movie_data = self.radarr_lookup_movie(item['id'])
+                if not movie_data:
+                    continue
+            if self.outbox:
+                self.outbox.put('radarr', movie_data, list_meta)
+            payloads.append(self._movie_payload(movie_data, list_meta))
+        
+        if not payloads:
+            return set()
+        
+        url = self._service_url('radarr', "/api/v3/movie/import")
         try:
-            response = requests.get(url, headers=headers)
+            response = self.http.post(url, json=payloads)
             response.raise_for_status()
             movies = response.json()
-            
-            # Extract TMDB IDs
-            return [movie['tmdbId'] for movie in movies if 'tmdbId' in movie]
+            added = {movie.get('tmdbId') for movie in movies}
+            for movie in movies:
+                self.queue_search('radarr', movie)
         except Exception as e:
-            logger.error(f"Failed to get Radarr movies: {e}")
-            return []
+            logger.error(f"Failed to import movies: {e}")
+            return set()
+        
+        for payload in payloads:
+            if payload['tmdbId'] in added:
+                if self.outbox:
+                    self.outbox.resolve('radarr', payload)
+                logger.info(f"Added movie: {payload.get('title') or 'Unknown'}")
+        logger.info(f"Bulk import added {len(added)} of {len(payloads)} movies")
+        return added
     
-    def radarr_lookup_movie(self, tmdb_id: int) -> Optional[Dict]:
-        """Look up movie details in Radarr by TMDB ID"""
-        base_url = self.config['radarr']['base_url']
-        port = self.config['radarr'].get('port')
-        api_key = self.config['radarr']['api_key']
+    def log_fast_add_stats(self):
+        if self.fast_add_stats['added'] or self.fast_add_stats['fallbacks']:
+            logger.info(
+                f"Direct adds: {self.fast_add_stats['added']} without lookup, "
+                f"{self.fast_add_stats['fallbacks']} fell back to lookup"
+            )
+    
+    def select_movie_lists(self, total_movie_ddl: int) -> List[Dict]:
+        """Order movie list slots for this run by weighted rotation"""
+        movie_list = self.config.get('movies', [])
         
-        if port:
-            url = f"{base_url}:{port}/api/v3/movie/lookup?term=tmdb%3A{tmdb_id}"
-        else:
-            url = f"{base_url}/api/v3/movie/lookup?term=tmdb%3A{tmdb_id}"
+        # The planner picks by score, so lists only pay for the movies it takes from them
+        list_in_order = self.rotation.schedule('movies', movie_list, total_movie_ddl, reserve=not self.planner)
+        
+        logger.info(f"Processing movies starting from list {list_in_order[0]['name']}")
+        
+        return list_in_order
+    
+    def planner_lists(self, list_in_order: List[Dict]) -> List[Dict]:
+        """Every configured movie list once, in rotation order; lists without a slot this run go last"""
+        lists = {}
+        for list_meta in list_in_order + self.config.get('movies', []):
+            lists.setdefault(list_meta['id'], list_meta)
+        return list(lists.values())
+    
+    def open_list_streams(self, list_in_order: List[Dict]) -> Dict:
+        """Open a lazy stream for every list used this run, keyed by list ID"""
+        if self.planner:
+            list_in_order = self.planner_lists(list_in_order)
+        
+        list_item_dictionary = {}
+        for list_meta in list_in_order:
+            if list_meta['id'] not in list_item_dictionary:
+                list_item_dictionary[list_meta['id']] = self.stream_list_items(list_meta)
+        return list_item_dictionary
+    
+    def fetch_movie_lists(self, list_in_order: List[Dict]) -> Dict:
+        """Open list streams and load their first pages"""
+        list_item_dictionary = self.open_list_streams(list_in_order)
+        
+        # Load first pages in parallel; MDBList's concurrency cap is enforced by the session pool
+        max_workers = int(self.config.get('mdbList', {}).get('max_workers', 4))
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            # Each worker inherits the current phase budget
+            futures = [
+                executor.submit(contextvars.copy_context().run, stream.prefetch)
+                for stream in list_item_dictionary.values()
+            ]
+            for future in futures:
+                future.result()
+        
+        return list_item_dictionary
+    
+    def log_list_usage(self, list_item_dictionary: Dict):
+        """Log how much of each list was actually downloaded"""
+        for stream in list_item_dictionary.values():
+            logger.info(
+                f"Fetched {len(stream.items)} items ({stream.pages_fetched} pages) "
+                f"from list {stream.list_meta['name']}"
+            )
+    
+    def select_movie_candidates(self, list_in_order: List[Dict], list_item_dictionary: Dict,
+                                existing_tmdb_ids: LibraryIndex, total_movie_ddl: int) -> List[Tuple[Dict, Dict]]:
+        """Pick (item, list) pairs the way add_movies would if every add succeeded"""
+        candidates = []
+        selected = set()
+        for list_meta in list_in_order:
+            if len(candidates) >= total_movie_ddl:
+                break
+            
+            for item in list_item_dictionary[list_meta['id']]:
+                self.budget.check()
+                
+                if item.get('mediatype') != 'movie':
+                    continue
+                
+                tmdb_id = item.get('id')
+                
+                if not tmdb_id or tmdb_id in existing_tmdb_ids or tmdb_id in selected:
+                    continue
+                
+                if self.negative_cache.blocked('radarr', tmdb_id):
+                    continue
+                
+                candidates.append((item, list_meta))
+                selected.add(tmdb_id)
+                break
+        
+        return candidates
+    
+    def drop_superseded_adds(self, service: str, failed: List[Dict], keep: int = 0):
+        """
+        Resolve the outbox entries of failed adds whose place another title has taken
+        Only the last `keep` failures, which capacity is still left for, stay
+        queued for the next run's replay.
+        """
+        while len(failed) > keep:
+            data = failed.pop(0)
+            if self.outbox:
+                self.outbox.resolve(service, data)
+    
+    def record_movie_added(self, tmdb_id: int, existing_tmdb_ids: LibraryIndex, list_meta: Dict):
+        self.added['movies'] += 1
+        self.rotation.record_add('movies', list_meta['id'])
+        self.journal.record('add', kind='movies', tmdb_id=tmdb_id)
+        self.record_library_add('radarr', tmdb_id)
+        existing_tmdb_ids.add(tmdb_id)  # Prevent duplicates in this run
+    
+    PLANNER_WEIGHTS = {
+        'priority': 1.0,
+        'rank': 1.0,
+        'rotation': 0.5
+    }
+    
+    def plan_movies(self, list_in_order: List[Dict], list_item_dictionary: Dict,
+                    existing_tmdb_ids: LibraryIndex, total_movie_ddl: int) -> MoviePlan:
+        """
+        Score candidates from every list and keep the best in a bounded heap
+        Each list contributes its first planner.depth items. A movie's score
+        combines its list's priority, its MDBList rank and how early its list
+        comes in this hour's rotation; a movie on several lists keeps its best
+        score. A few spare candidates stand in for adds that fail.
+        """
+        planner_config = self.config.get('planner', {})
+        weights = {**self.PLANNER_WEIGHTS, **planner_config.get('weights', {})}
+        depth = max(1, int(planner_config.get('depth', 100)))
+        limit = total_movie_ddl + int(planner_config.get('spare', 5))
+        
+        # Rotation order of distinct lists, first appearance wins
+        rotation = {
+            list_meta['id']: (offset, list_meta)
+            for offset, list_meta in enumerate(self.planner_lists(list_in_order))
+        }
         
-        headers = {"X-Api-Key": api_key}
+        best: Dict[int, Dict] = {}
+        scanned = duplicates = filtered = 0
+        for list_id, (offset, list_meta) in rotation.items():
+            priority = float(list_meta.get('priority', 1))
+            for position, item in enumerate(list_item_dictionary[list_id]):
+                if position >= depth:
+                    break
+                self.budget.check()
+                scanned += 1
+                
+                tmdb_id = item.get('id')
+                if item.get('mediatype') != 'movie' or not tmdb_id:
+                    continue
+                if tmdb_id in existing_tmdb_ids or self.negative_cache.blocked('radarr', tmdb_id):
+                    filtered += 1
+                    continue
+                
+                rank = item.get('rank') or position + 1
+                score = (
+                    weights['priority'] * priority
+                    + weights['rank'] * (1 - min(rank - 1, depth) / depth)
+                    + weights['rotation'] * (1 - offset / len(rotation))
+                )
+                
+                current = best.get(tmdb_id)
+                if current is not None:
+                    duplicates += 1
+                    if score <= current['score']:
+                        current['also_in'].append(list_meta['name'])
+                        continue
+                    also_in = current['also_in'] + [current['list']['name']]
+                else:
+                    also_in = []
+                
+                best[tmdb_id] = {
+                    'score': score, 'item': item, 'list': list_meta, 'priority': priority,
+                    'rank': rank, 'rotation': offset, 'also_in': also_in
+                }
         
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            results = response.json()
-            return results[0] if results else None
-        except Exception as e:
-            logger.error(f"Failed to lookup movie {tmdb_id}: {e}")
-            return None
+        # Ties go to the earlier list in the rotation, then the better rank
+        entries = heapq.nlargest(
+            limit, best.values(), key=lambda entry: (entry['score'], -entry['rotation'], -entry['rank'])
+        )
+        return MoviePlan(entries, scanned, duplicates, filtered)
     
-    def radarr_add_movie(self, movie_data: Dict, list_meta: Dict) -> bool:
-        """Add a movie to Radarr"""
-        base_url = self.config['radarr']['base_url']
-        port = self.config['radarr'].get('port')
-        api_key = self.config['radarr']['api_key']
+    def add_movies_planned(self, list_in_order: List[Dict], list_item_dictionary: Dict,
+                           existing_tmdb_ids: LibraryIndex, total_movie_ddl: int) -> int:
+        """Add the planner's candidates in score order, then fill any shortfall slot by slot"""
+        plan = self.plan_movies(list_in_order, list_item_dictionary, existing_tmdb_ids, total_movie_ddl)
+        plan.explain()
         
-        if port:
-            url = f"{base_url}:{port}/api/v3/movie"
-        else:
-            url = f"{base_url}/api/v3/movie"
+        movies_added = 0
+        failed = []
+        for item, list_meta in plan.candidates():
+            if movies_added >= total_movie_ddl:
+                break
+            
+            self.budget.check()
+            self.require_service('radarr')
+            
+            if self.add_movie_item(item, list_meta):
+                movies_added += 1
+                self.record_movie_added(item['id'], existing_tmdb_ids, list_meta)
+                self.drop_superseded_adds('radarr', failed, total_movie_ddl - movies_added)
+            else:
+                failed.append({'tmdbId': item['id']})
         
-        headers = {"X-Api-Key": api_key}
+        # The plan only covers each list's first planner.depth items; walk the lists for the rest
+        if movies_added < total_movie_ddl:
+            movies_added += self.add_movies(
+                list_in_order, list_item_dictionary, existing_tmdb_ids, total_movie_ddl - movies_added
+            )
+            self.drop_superseded_adds('radarr', failed, total_movie_ddl - movies_added)
         
-        payload = {
-            "tmdbId": movie_data['tmdbId'],
-            "qualityProfileId": list_meta['qualityProfileId'],
-            "rootFolderPath": list_meta['rootFolderPath'],
-            "addOptions": {
-                "monitor": "movieOnly",
-                "searchForMovie": True
-            }
-        }
-
-        try:
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            logger.info(f"Added movie: {movie_data.get('title', 'Unknown')}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to add movie: {e}")
-            return False
+        return movies_added
     
-    def process_movies(self, total_movie_ddl: int):
-        """Process movie lists and add to Radarr"""
-        movie_list = self.config.get('movies', [])
+    def add_movies_batched(self, list_in_order: List[Dict], list_item_dictionary: Dict,
+                           existing_tmdb_ids: LibraryIndex, total_movie_ddl: int) -> int:
+        """Add the selected movies with one bulk import, then fall back to single adds"""
+        self.require_service('radarr')
+        if self.planner:
+            plan = self.plan_movies(list_in_order, list_item_dictionary, existing_tmdb_ids, total_movie_ddl)
+            plan.explain()
+            candidates = plan.candidates()[:total_movie_ddl]
+        else:
+            candidates = self.select_movie_candidates(
+                list_in_order, list_item_dictionary, existing_tmdb_ids, total_movie_ddl
+            )
+        imported = self.radarr_import_movies(candidates)
         
-        if not movie_list:
-            logger.info("No movie lists configured")
-            return
+        movies_added = 0
+        failed = []
+        for item, list_meta in candidates:
+            if item['id'] not in imported:
+                self.budget.check()
+                self.require_service('radarr')
+                if not self.add_movie_item(item, list_meta):
+                    failed.append({'tmdbId': item['id']})
+                    continue
+            movies_added += 1
+            self.record_movie_added(item['id'], existing_tmdb_ids, list_meta)
         
-        # Calculate starting index based on current hour
-        list_count = len(movie_list)
-        start_index = self.current_hour % list_count
+        # Candidates that could not be added at all are replaced one at a time
+        if movies_added < total_movie_ddl:
+            movies_added += self.add_movies(
+                list_in_order, list_item_dictionary, existing_tmdb_ids, total_movie_ddl - movies_added
+            )
+            self.drop_superseded_adds('radarr', failed, total_movie_ddl - movies_added)
         
-        logger.info(f"Processing movies starting from index {start_index}")
+        return movies_added
+    
+    def predict_movie_slots(self, list_in_order: List[Dict], list_item_dictionary: Dict,
+                            existing_tmdb_ids: LibraryIndex, slot: int = 0,
+                            position: int = 0) -> Iterator[Tuple[int, int, Dict]]:
+        """
+        Yield (slot, position, item) in the order add_movies tries them, assuming every add succeeds
+        Starts at `position` in the list of `slot`; later slots start from
+        the top of their list, as add_movies does.
+        """
+        taken = set()
+        for slot in range(slot, len(list_in_order)):
+            items = list_item_dictionary[list_in_order[slot]['id']]
+            for index, item in enumerate(islice(items, position, None), position):
+                self.budget.check()
+                
+                if item.get('mediatype') != 'movie':
+                    continue
+                
+                tmdb_id = item.get('id')
+                
+                if not tmdb_id or tmdb_id in existing_tmdb_ids or tmdb_id in taken:
+                    continue
+                
+                if self.negative_cache.blocked('radarr', tmdb_id):
+                    continue
+                
+                taken.add(tmdb_id)
+                yield slot, index, item
+                break
+            position = 0
+    
+    def add_movies_pipelined(self, list_in_order: List[Dict], list_item_dictionary: Dict,
+                             existing_tmdb_ids: LibraryIndex, total_movie_ddl: int) -> int:
+        """
+        Look up the next candidates in parallel while adds commit one at a time through a quota gate
+        Candidates are predicted as if every add succeeds. When one fails, the
+        guesses after it are dropped and predicted again from that slot's next
+        item, so the adds are exactly those add_movies would make.
+        """
+        lookahead = max(1, self.lookahead)
+        gate = QuotaGate(total_movie_ddl)
+        predictions = self.predict_movie_slots(list_in_order, list_item_dictionary, existing_tmdb_ids)
+        pending = deque()
+        # Kept across re-predictions, so a title guessed again is not looked up twice
+        lookups = {}
+        # Adds each slot lost to transient errors before it was filled
+        failed: Dict[int, List[Dict]] = {}
+        executor = ThreadPoolExecutor(max_workers=lookahead)
         
-        list_in_order = []
-
-        for i in range(total_movie_ddl):
-            list_in_order.append(movie_list[(start_index + i) % list_count])
-            
-        # Fetch all list items
-        list_item_dictionary = {}
-        for list_meta in movie_list:
-            items = self.get_list_items(list_meta)
-            list_item_dictionary[list_meta['id']] = items
-            logger.info(f"Fetched {len(items)} items from list {list_meta['name']}")
+        def fill():
+            while len(pending) < lookahead and not gate.filled:
+                prediction = next(predictions, None)
+                if prediction is None:
+                    return
+                tmdb_id = prediction[2]['id']
+                if tmdb_id not in lookups:
+                    lookups[tmdb_id] = executor.submit(
+                        contextvars.copy_context().run, self.radarr_lookup_movie, tmdb_id
+                    )
+                pending.append(prediction)
         
-        # Get existing movies from Radarr
-        existing_tmdb_ids = self.get_radarr_existing_movies()
-        logger.info(f"Found {len(existing_tmdb_ids)} existing movies in Radarr")
+        try:
+            fill()
+            while pending and not gate.filled:
+                slot, position, item = pending.popleft()
+                list_meta = list_in_order[slot]
+                self.require_service('radarr')
+                movie_data = lookups.pop(item['id']).result()
+                
+                added = False
+                if movie_data and gate.reserve():
+                    added = self.radarr_add_movie(movie_data, list_meta)
+                    if added:
+                        gate.commit()
+                        self.record_movie_added(item['id'], existing_tmdb_ids, list_meta)
+                        self.drop_superseded_adds('radarr', failed.pop(slot, []))
+                    else:
+                        gate.release()
+                
+                if not added:
+                    failed.setdefault(slot, []).append({'tmdbId': item['id']})
+                    # Later guesses assumed this add would succeed
+                    pending.clear()
+                    for tmdb_id, future in list(lookups.items()):
+                        if future.cancel():
+                            del lookups[tmdb_id]
+                    predictions = self.predict_movie_slots(
+                        list_in_order, list_item_dictionary, existing_tmdb_ids, slot, position + 1
+                    )
+                
+                fill()
+        finally:
+            # Surplus speculative lookups are not needed once the quota is met
+            cancelled = sum(future.cancel() for future in lookups.values())
+            if cancelled:
+                logger.info(f"Cancelled {cancelled} speculative lookups")
+            # Lookups already running finish on their own; the run does not wait for them
+            executor.shutdown(wait=False)
         
-        # Process each list
+        return gate.committed
+    
+    def movie_adder(self) -> Callable[[List[Dict], Dict, LibraryIndex, int], int]:
+        """Pick the add strategy configured for Radarr"""
+        if self.batch_add:
+            return self.add_movies_batched
+        if self.planner:
+            return self.add_movies_planned
+        if self.lookahead > 0:
+            if not self.fast_add:
+                return self.add_movies_pipelined
+            logger.warning("radarr.lookahead is ignored while fast_add is on; direct adds need no lookups")
+        return self.add_movies
+    
+    def add_movies(self, list_in_order: List[Dict], list_item_dictionary: Dict,
+                   existing_tmdb_ids: LibraryIndex, total_movie_ddl: int) -> int:
+        """Add up to total_movie_ddl movies, one per rotated list slot"""
         movies_added = 0
         for idx, list_meta in enumerate(list_in_order):
             # Cycle through lists if we've added more than total_movie_ddl
@@ -353,12 +2371,17 @@ class MediaSyncManager:
                 break
             
             items = list_item_dictionary[list_meta['id']]
+            # Adds this slot tried and lost to a transient error
+            failed = []
             
             # Filter for movies only and not already in Radarr
             for item in items:
                 if movies_added >= total_movie_ddl:
                     break
                 
+                self.budget.check()
+                self.require_service('radarr')
+                
                 if item.get('mediatype') != 'movie':
                     continue
                 
@@ -367,72 +2390,87 @@ class MediaSyncManager:
                 if not tmdb_id or tmdb_id in existing_tmdb_ids:
                     continue
                 
-                movie_data = self.radarr_lookup_movie(tmdb_id)
-        
-                if movie_data:
-                    if self.radarr_add_movie(movie_data, list_meta):
-                        movies_added += 1
-                        existing_tmdb_ids.append(tmdb_id)  # Prevent duplicates in this run
-                        break;
+                if self.negative_cache.blocked('radarr', tmdb_id):
+                    continue
+                
+                if self.add_movie_item(item, list_meta):
+                    movies_added += 1
+                    self.record_movie_added(tmdb_id, existing_tmdb_ids, list_meta)
+                    self.drop_superseded_adds('radarr', failed)
+                    break;
+                failed.append({'tmdbId': tmdb_id})
         
-        logger.info(f"Added {movies_added} movies to Radarr")
+        return movies_added
     
-    def get_sonarr_existing_series(self) -> List[int]:
-        """Get list of existing TMDB IDs from Sonarr"""
-        base_url = self.config['sonarr']['base_url']
-        port = self.config['sonarr'].get('port')
-        api_key = self.config['sonarr']['api_key']
+    def process_movies(self, total_movie_ddl: int):
+        """Process movie lists and add to Radarr"""
+        movie_list = self.config.get('movies', [])
         
-        if port:
-            url = f"{base_url}:{port}/api/v3/series"
-        else:
-            url = f"{base_url}/api/v3/series"
+        if not movie_list:
+            logger.info("No movie lists configured")
+            return
+        
+        self.require_service('radarr')
+        list_in_order = self.select_movie_lists(total_movie_ddl)
+            
+        # Open streams for the lists this run will draw from
+        with self.budget.phase('movies', 'lists'):
+            list_item_dictionary = self.fetch_movie_lists(list_in_order)
         
-        headers = {"X-Api-Key": api_key}
+        # Get existing movies from Radarr
+        with self.budget.phase('movies', 'library'):
+            existing_tmdb_ids = self.load_library('radarr')
+        logger.info(f"Found {len(existing_tmdb_ids)} existing movies in Radarr")
         
+        # Process each list
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            series = response.json()
-            return [show['tmdbId'] for show in series if 'tmdbId' in show]
-        except Exception as e:
-            logger.error(f"Failed to get Sonarr series: {e}")
-            return []
+            with self.budget.phase('movies', 'adds'):
+                movies_added = self.movie_adder()(list_in_order, list_item_dictionary, existing_tmdb_ids, total_movie_ddl)
+        finally:
+            self.log_list_usage(list_item_dictionary)
+        
+        logger.info(f"Added {movies_added} movies to Radarr")
     
-    def sonarr_lookup_series(self, tmdb_id: int) -> Optional[Dict]:
+    def sonarr_lookup_series(self, tmdb_id: int, use_cache: bool = True) -> Optional[Dict]:
         """Look up series details in Sonarr by TMDB ID"""
-        base_url = self.config['sonarr']['base_url']
-        port = self.config['sonarr'].get('port')
-        api_key = self.config['sonarr']['api_key']
-        
-        if port:
-            url = f"{base_url}:{port}/api/v3/series/lookup?term=tmdb%3A{tmdb_id}"
-        else:
-            url = f"{base_url}/api/v3/series/lookup?term=tmdb%3A{tmdb_id}"
-        
-        headers = {"X-Api-Key": api_key}
-        
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            results = response.json()
-            return results[0] if results else None
+            return self.lookup('sonarr', "/api/v3/series/lookup", tmdb_id, use_cache)
         except Exception as e:
             logger.error(f"Failed to lookup series {tmdb_id}: {e}")
             return None
     
-    def sonarr_add_series(self, series_data: Dict, list_meta: Dict) -> bool:
-        """Add a series to Sonarr"""
-        base_url = self.config['sonarr']['base_url']
-        port = self.config['sonarr'].get('port')
-        api_key = self.config['sonarr']['api_key']
+    def resolve_series(self, item: Dict) -> Optional[Dict]:
+        """
+        Map a show's TMDB ID to the TVDB ID and title Sonarr needs
+        Uses the IDs already on the MDBList item, then the lookup cache, and
+        only asks Sonarr when neither has them.
+        """
+        tmdb_id = item['id']
+        if item.get('tvdb_id') and item.get('title'):
+            self.series_resolution['item'] += 1
+            return {'tmdbId': tmdb_id, 'tvdbId': item['tvdb_id'], 'title': item['title']}
         
-        if port:
-            url = f"{base_url}:{port}/api/v3/series"
-        else:
-            url = f"{base_url}/api/v3/series"
+        if self.lookup_cache:
+            cached = self.lookup_cache.get('sonarr', tmdb_id)
+            if cached:
+                self.series_resolution['cache'] += 1
+                return cached
         
-        headers = {"X-Api-Key": api_key}
+        self.series_resolution['lookup'] += 1
+        return self.sonarr_lookup_series(tmdb_id, use_cache=False)
+    
+    def log_series_resolution(self):
+        resolution = self.series_resolution
+        if any(resolution.values()):
+            logger.info(
+                f"TVDB IDs: {resolution['item'] + resolution['cache']} lookups avoided "
+                f"({resolution['item']} from list items, {resolution['cache']} cached), "
+                f"{resolution['lookup']} Sonarr lookups"
+            )
+    
+    def sonarr_add_series(self, series_data: Dict, list_meta: Dict) -> bool:
+        """Add a series to Sonarr"""
+        url = self._service_url('sonarr', "/api/v3/series")
         
         payload = {
             "title": series_data['title'], 
@@ -441,21 +2479,82 @@ class MediaSyncManager:
             "rootFolderPath": list_meta['rootFolderPath'],
             "addOptions": {
                 "monitor": "all",
-                "searchForMissingEpisodes": True,
-                "searchForCutoffUnmetEpisodes": True
+                "searchForMissingEpisodes": not self.deferred_search,
+                "searchForCutoffUnmetEpisodes": not self.deferred_search
             },
             "monitored": True
         }
         
+        if self.outbox:
+            self.outbox.put('sonarr', series_data, list_meta)
+        
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            response = self.http.post(url, json=payload)
             response.raise_for_status()
+            if self.outbox:
+                self.outbox.resolve('sonarr', series_data)
+            self.queue_search('sonarr', response.json())
             logger.info(f"Added series: {series_data.get('title', 'Unknown')}")
             return True
         except Exception as e:
             logger.error(f"Failed to add series: {e}")
+            if self.outbox and self._is_rejection(e):
+                self.outbox.resolve('sonarr', series_data)
+            if self._is_rejection(e) and series_data.get('tmdbId'):
+                self.negative_cache.record('sonarr', series_data['tmdbId'], 'rejected')
             return False
     
+    def select_show_list(self) -> Dict:
+        """Pick one show list by weighted rotation"""
+        show_list = self.config.get('shows', [])
+        return self.rotation.schedule('shows', show_list, 1)[0]
+    
+    def add_shows(self, items: Iterable[Dict], existing_tmdb_ids: LibraryIndex,
+                  selected_list_meta: Dict, total_show_ddl: int) -> int:
+        """Add up to total_show_ddl shows from the selected list"""
+        shows_added = 0
+        failed = []
+        for item in items:
+            if shows_added >= total_show_ddl:
+                break
+            
+            self.budget.check()
+            self.require_service('sonarr')
+
+            if item.get('mediatype') != 'show':
+                continue
+            
+            tmdb_id = item.get('id')
+            
+            if not tmdb_id or tmdb_id in existing_tmdb_ids:
+                continue
+            
+            # Older Sonarr versions only know series by TVDB ID
+            if existing_tmdb_ids.contains_tvdb(item.get('tvdb_id')):
+                continue
+            
+            if self.negative_cache.blocked('sonarr', tmdb_id):
+                continue
+            
+            # Resolve and add series
+            series_data = self.resolve_series(item)
+            if series_data and existing_tmdb_ids.contains_tvdb(series_data.get('tvdbId')):
+                # Known by TVDB ID only, or excluded in Sonarr
+                continue
+            if series_data:
+                if self.sonarr_add_series(series_data, selected_list_meta):
+                    shows_added += 1
+                    self.added['shows'] += 1
+                    self.rotation.record_add('shows', selected_list_meta['id'])
+                    self.journal.record('add', kind='shows', tmdb_id=tmdb_id)
+                    existing_tmdb_ids.add(tmdb_id, series_data['tvdbId'])
+                    self.record_library_add('sonarr', tmdb_id, series_data['tvdbId'])
+                    self.drop_superseded_adds('sonarr', failed, total_show_ddl - shows_added)
+                else:
+                    failed.append(series_data)
+        
+        return shows_added
+    
     def process_shows(self, total_show_ddl: int):
         """Process show lists and add to Sonarr"""
         if total_show_ddl < 1:
@@ -468,71 +2567,442 @@ class MediaSyncManager:
             logger.info("No show lists configured")
             return
         
-        # Pick one list based on current hour
-        list_count = len(show_list)
-        index = self.current_hour % list_count
-        selected_list_meta = show_list[index]
+        self.require_service('sonarr')
+        selected_list_meta = self.select_show_list()
         
         logger.info(f"Processing shows from list {selected_list_meta['name']}")
         
-        # Fetch list items
-        items = self.get_list_items(selected_list_meta)
+        # Stream list items, paging only as far as needed
+        items = self.stream_list_items(selected_list_meta)
+        with self.budget.phase('shows', 'lists'):
+            items.prefetch()
         
         # Get existing series from Sonarr
-        existing_tmdb_ids = self.get_sonarr_existing_series()
+        with self.budget.phase('shows', 'library'):
+            existing_tmdb_ids = self.load_library('sonarr')
         logger.info(f"Found {len(existing_tmdb_ids)} existing series in Sonarr")
         
         # Process shows
-        shows_added = 0
-        for item in items:
-            if shows_added >= total_show_ddl:
+        try:
+            with self.budget.phase('shows', 'adds'):
+                shows_added = self.add_shows(items, existing_tmdb_ids, selected_list_meta, total_show_ddl)
+        finally:
+            self.log_list_usage({selected_list_meta['id']: items})
+        
+        logger.info(f"Added {shows_added} shows to Sonarr")
+    
+    def queue_search(self, service: str, resource: Dict):
+        """Remember a newly added movie/series for the end-of-run search when searches are deferred"""
+        if self.deferred_search and resource.get('id'):
+            with self._search_lock:
+                self.pending_searches[service].append(resource['id'])
+    
+    def post_command(self, service: str, body: Dict) -> Dict:
+        """Queue a Radarr/Sonarr command"""
+        response = self.http.post(self._service_url(service, "/api/v3/command"), json=body)
+        response.raise_for_status()
+        return response.json()
+    
+    def send_search_commands(self) -> List[Tuple[str, str, Dict, float]]:
+        """
+        Send one search command covering every deferred add
+        Radarr searches all new movies with a single MoviesSearch; Sonarr's
+        SeriesSearch takes one series, so shows get a command each.
+        """
+        commands = []
+        movie_ids = self.pending_searches['radarr']
+        if movie_ids:
+            try:
+                command = self.post_command('radarr', {'name': 'MoviesSearch', 'movieIds': movie_ids})
+                commands.append(('radarr', f"MoviesSearch for {len(movie_ids)} movies", command, time.monotonic()))
+                self.pending_searches['radarr'] = []
+            except Exception as e:
+                logger.error(f"Failed to queue movie search: {e}")
+        
+        for series_id in list(self.pending_searches['sonarr']):
+            try:
+                command = self.post_command('sonarr', {'name': 'SeriesSearch', 'seriesId': series_id})
+            except Exception as e:
+                logger.error(f"Failed to queue series search: {e}")
                 break
-
-            if item.get('mediatype') != 'show':
-                continue
-            
-            tmdb_id = item.get('id')
+            commands.append(('sonarr', f"SeriesSearch for series {series_id}", command, time.monotonic()))
+            self.pending_searches['sonarr'].remove(series_id)
+        
+        return commands
+    
+    def wait_for_commands(self, commands: List[Tuple[str, str, Dict, float]]):
+        """Poll queued commands until they finish or search.wait runs out, logging how long each took"""
+        search_config = self.config.get('search', {})
+        wait = self._parse_duration(search_config.get('wait', '1m')).total_seconds()
+        interval = self._parse_duration(search_config.get('poll_interval', '5s')).total_seconds()
+        started = time.monotonic()
+        durations = []
+        
+        pending = commands
+        while pending:
+            still_running = []
+            for service, label, command, sent in pending:
+                try:
+                    response = self.http.get(self._service_url(service, f"/api/v3/command/{command['id']}"))
+                    response.raise_for_status()
+                    status = response.json().get('status')
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Failed to poll {label}: {e}")
+                    continue
+                
+                if status in ('completed', 'failed', 'aborted', 'cancelled'):
+                    durations.append(time.monotonic() - sent)
+                    logger.info(f"{label} {status} after {durations[-1]:.1f}s")
+                else:
+                    still_running.append((service, label, command, sent))
             
-            if not tmdb_id or tmdb_id in existing_tmdb_ids:
-                continue
+            pending = still_running
+            if pending and (time.monotonic() - started + interval > wait
+                            or interval >= self.budget.remaining()):
+                break
+            if pending:
+                time.sleep(interval)
+        
+        if commands:
+            average = f", {sum(durations) / len(durations):.1f}s average" if durations else ""
+            logger.info(
+                f"Search commands: {len(durations)} of {len(commands)} finished{average}; "
+                f"{len(pending)} still queued"
+            )
+    
+    def run_deferred_searches(self):
+        """Search for everything added this run (and earlier unsent searches) with batched commands"""
+        if not self.deferred_search:
+            return
+        
+        try:
+            with self.budget.phase('run', 'search'):
+                commands = self.send_search_commands()
+                self.wait_for_commands(commands)
+        except DeadlineExceeded as e:
+            logger.warning(f"Deferred searches stopped: {e}")
+        except Exception as e:
+            logger.error(f"Deferred searches failed: {e}")
+        finally:
+            # Searches that could not be sent go out with the next run's
+            save_json_state(self.state_dir / 'pending_searches.json', self.pending_searches)
+    
+    def replay_outbox(self, total_movie_ddl: int, total_show_ddl: int) -> Tuple[int, int]:
+        """Retry adds left unconfirmed by earlier runs before selecting anything new"""
+        if not self.outbox:
+            return 0, 0
+        
+        max_age = self._parse_duration(self.config.get('outbox', {}).get('max_age', '24h')).total_seconds()
+        replays = (
+            ('radarr', 'movies', total_movie_ddl, self.radarr_add_movie),
+            ('sonarr', 'shows', total_show_ddl, self.sonarr_add_series)
+        )
+        replayed = []
+        
+        for service, kind, capacity, add in replays:
+            added = 0
+            for entry in self.outbox.pending(service):
+                if time.time() - entry['created_at'] > max_age:
+                    logger.info(f"Dropping outbox entry for {entry['data'].get('title') or 'Unknown'} after {max_age:.0f}s")
+                    self.outbox.resolve(service, entry['data'])
+                    continue
+                if added >= capacity or not self.breakers[service].available():
+                    break
+                
+                self.budget.check()
+                if add(entry['data'], entry['list']):
+                    added += 1
+                    self.added[kind] += 1
+                    self.journal.record('add', kind=kind, tmdb_id=entry['data'].get('tmdbId'))
+                    self.record_library_add(service, entry['data'].get('tmdbId'), entry['data'].get('tvdbId'))
             
-            # Lookup and add series
-            series_data = self.sonarr_lookup_series(tmdb_id)
-            if series_data:
-                if self.sonarr_add_series(series_data, selected_list_meta):
-                    shows_added += 1
-                    existing_tmdb_ids.append(tmdb_id)
+            if added:
+                logger.info(f"Replayed {added} {kind} from the outbox")
+            replayed.append(added)
         
-        logger.info(f"Added {shows_added} shows to Sonarr")
+        return replayed[0], replayed[1]
+    
+    def compute_capacity(self) -> Tuple[int, int]:
+        """Movie and show capacity, reusing an interrupted run's RD count minus its adds"""
+        capacity = self.resume.get('capacity')
+        if capacity:
+            added = self.resume['added']
+            logger.info(
+                f"Resuming with capacity from the interrupted run, "
+                f"less {added['movies']} movies and {added['shows']} shows it already added"
+            )
+            return capacity['movies'] - added['movies'], capacity['shows'] - added['shows']
+        
+        rd_data = self.get_rd_active_count()
+        total_movie_ddl, total_show_ddl = self.calculate_download_capacity(rd_data)
+        self.journal.record('capacity', movies=total_movie_ddl, shows=total_show_ddl)
+        return total_movie_ddl, total_show_ddl
+    
+    def load_resume_state(self) -> Dict:
+        """
+        Checkpoints of an interrupted run still within journal.resume_window
+        Returns an empty dict when the last run finished or is too old.
+        """
+        records = self.journal.load() if self.journal.enabled else []
+        if not records or records[0].get('event') != 'started' or records[-1].get('event') == 'finished':
+            return {}
+        
+        window = self._parse_duration(self.config.get('journal', {}).get('resume_window', '15m'))
+        age = time.time() - records[0]['at']
+        if age >= window.total_seconds():
+            logger.info(f"Not resuming interrupted run from {age:.0f}s ago")
+            return {}
+        
+        resume = {'capacity': None, 'added': {'movies': 0, 'shows': 0}, 'libraries': set(), 'phases': set()}
+        for record in records:
+            event = record['event']
+            if event == 'capacity':
+                resume['capacity'] = {'movies': record['movies'], 'shows': record['shows']}
+            elif event == 'add':
+                resume['added'][record['kind']] += 1
+            elif event == 'library':
+                resume['libraries'].add(record['service'])
+            elif event == 'phase':
+                resume['phases'].add(record['label'])
+        
+        logger.info(
+            f"Resuming interrupted run from {age:.0f}s ago "
+            f"(completed: {', '.join(sorted(resume['phases'])) or 'nothing'})"
+        )
+        
+        # Lists the interrupted run fetched are served from the cache without revalidation
+        if self.list_cache and {'movies lists', 'shows lists'} & resume['phases']:
+            self.list_cache.max_age = max(self.list_cache.max_age, window)
+        return resume
+    
+    def execute(self):
+        """Check capacity, then process movies and shows"""
+        total_movie_ddl, total_show_ddl = self.compute_capacity()
+        
+        # Unconfirmed adds from earlier runs take their capacity first
+        with self.budget.phase('outbox', 'replay'):
+            replayed_movies, replayed_shows = self.replay_outbox(total_movie_ddl, total_show_ddl)
+        total_movie_ddl -= replayed_movies
+        total_show_ddl -= replayed_shows
+
+        if total_movie_ddl > 0:
+            self.run_pipeline(self.process_movies, total_movie_ddl)
+        else:
+            logger.info("No capacity for movies")
+
+        self.run_pipeline(self.process_shows, total_show_ddl)
+    
+    def require_service(self, service: str):
+        """Fail fast when a service's circuit is open"""
+        if not self.breakers[service].available():
+            raise CircuitOpenError(f"{service} circuit is open")
+    
+    def run_pipeline(self, process: Callable[[int], None], capacity: int):
+        """Run process_movies/process_shows, letting the other continue if one is cut short"""
+        try:
+            process(capacity)
+        except CircuitOpenError as e:
+            logger.warning(f"Skipped: {e}")
+        except DeadlineExceeded as e:
+            if self.budget.run_expired():
+                raise
+            logger.warning(f"Stopped early: {e}")
     
     def run(self):
         """Main execution flow"""
         logger.info("=== Starting Media Sync ===")
+        self.budget = self.http.budget = self._create_budget()
         
         # Check blackout periods first
         if self.is_in_blackout_period():
             logger.info("Skipping execution - currently in blackout period")
             return
         
+        self.resume = self.load_resume_state()
+        self.journal.open(resume=bool(self.resume))
+        
+        # Crashes and interrupts leave the journal open for the next run to resume
+        finished = False
         try:
-            rd_data = self.get_rd_active_count()
-            total_movie_ddl, total_show_ddl = self.calculate_download_capacity(rd_data)
-
-            if total_movie_ddl > 0:
-                self.process_movies(total_movie_ddl)
-            else:
-                logger.info("No capacity for movies")
-
-            self.process_shows(total_show_ddl)
+            self.execute()
+            finished = True
             
-            logger.info("=== Media Sync Completed Successfully ===")
+            if self.budget.expired:
+                logger.info("=== Media Sync Completed Partially ===")
+            else:
+                logger.info("=== Media Sync Completed Successfully ===")
             
+        except DeadlineExceeded as e:
+            finished = True
+            logger.warning(f"Media sync stopped: {e}")
         except Exception as e:
             logger.error(f"Media sync failed: {e}")
             raise
+        finally:
+            self.run_deferred_searches()
+            self.journal.close(finished)
+            self.rotation.save()
+            self.budget.log_report(self.added)
+            self.log_fast_add_stats()
+            self.log_series_resolution()
+            for service, library in self.libraries.items():
+                library.log_bloom_stats(service)
+            self.http.log_stats()
+            self.http.close()
+            self.save_breakers()
+            self.negative_cache.log_stats()
+            self.negative_cache.save()
+            if self.lookup_cache:
+                self.lookup_cache.log_stats()
+                self.lookup_cache.save()
+            if self.list_cache:
+                self.list_cache.log_stats()
+                self.list_cache.evict()
+
+
+class AsyncMediaSyncManager(MediaSyncManager):
+    """
+    Asyncio engine that overlaps independent requests
+    Lists, library downloads, and the movie/show pipelines run concurrently;
+    selection and adds reuse MediaSyncManager so decisions are identical.
+    Blocking HTTP calls run on worker threads, bounded per host by the
+    session pool.
+    """
+
+    def __init__(self, config_path: str = "config.json"):
+        super().__init__(config_path)
+        self.max_workers = int(self.config.get('async', {}).get('max_workers', 16))
+
+    @staticmethod
+    async def to_thread(func: Callable, *args):
+        """Run a blocking call on a worker thread in the current context, like asyncio.to_thread (Python 3.9+)"""
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(None, context.run, func, *args)
+
+    async def in_phase(self, pipeline: str, name: str, func: Callable, *args):
+        """Run a blocking call on a worker thread under a phase budget"""
+        with self.budget.phase(pipeline, name):
+            return await self.to_thread(func, *args)
+
+    async def process_movies_async(self, total_movie_ddl: int):
+        """Concurrent counterpart of process_movies"""
+        movie_list = self.config.get('movies', [])
+        
+        if not movie_list:
+            logger.info("No movie lists configured")
+            return
+        
+        self.require_service('radarr')
+        list_in_order = self.select_movie_lists(total_movie_ddl)
+        
+        # Load the first page of every list and the Radarr library at the same time
+        list_item_dictionary = self.open_list_streams(list_in_order)
+        *_, existing_tmdb_ids = await asyncio.gather(
+            *(self.in_phase('movies', 'lists', stream.prefetch) for stream in list_item_dictionary.values()),
+            self.in_phase('movies', 'library', self.load_library, 'radarr')
+        )
+        logger.info(f"Found {len(existing_tmdb_ids)} existing movies in Radarr")
+        
+        try:
+            movies_added = await self.in_phase(
+                'movies', 'adds',
+                self.movie_adder(), list_in_order, list_item_dictionary, existing_tmdb_ids, total_movie_ddl
+            )
+        finally:
+            self.log_list_usage(list_item_dictionary)
+        
+        logger.info(f"Added {movies_added} movies to Radarr")
+
+    async def process_shows_async(self, total_show_ddl: int):
+        """Concurrent counterpart of process_shows"""
+        if total_show_ddl < 1:
+            logger.info("Insufficient capacity for shows, skipping")
+            return
+        
+        if not self.config.get('shows', []):
+            logger.info("No show lists configured")
+            return
+        
+        self.require_service('sonarr')
+        selected_list_meta = self.select_show_list()
+        
+        logger.info(f"Processing shows from list {selected_list_meta['name']}")
+        
+        items = self.stream_list_items(selected_list_meta)
+        _, existing_tmdb_ids = await asyncio.gather(
+            self.in_phase('shows', 'lists', items.prefetch),
+            self.in_phase('shows', 'library', self.load_library, 'sonarr')
+        )
+        logger.info(f"Found {len(existing_tmdb_ids)} existing series in Sonarr")
+        
+        try:
+            shows_added = await self.in_phase(
+                'shows', 'adds',
+                self.add_shows, items, existing_tmdb_ids, selected_list_meta, total_show_ddl
+            )
+        finally:
+            self.log_list_usage({selected_list_meta['id']: items})
+        
+        logger.info(f"Added {shows_added} shows to Sonarr")
+
+    async def execute_async(self):
+        """Check capacity, then run the movie and show pipelines together"""
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=self.max_workers)
+        )
+        
+        total_movie_ddl, total_show_ddl = await self.to_thread(self.compute_capacity)
+        
+        replayed_movies, replayed_shows = await self.in_phase(
+            'outbox', 'replay', self.replay_outbox, total_movie_ddl, total_show_ddl
+        )
+        total_movie_ddl -= replayed_movies
+        total_show_ddl -= replayed_shows
+        
+        pipelines = []
+        if total_movie_ddl > 0:
+            pipelines.append(self.process_movies_async(total_movie_ddl))
+        else:
+            logger.info("No capacity for movies")
+        pipelines.append(self.process_shows_async(total_show_ddl))
+        
+        # Let one pipeline finish even if the other runs out of time
+        results = await asyncio.gather(*pipelines, return_exceptions=True)
+        expired = False
+        for result in results:
+            if isinstance(result, CircuitOpenError):
+                logger.warning(f"Skipped: {result}")
+            elif isinstance(result, DeadlineExceeded):
+                logger.warning(f"Stopped early: {result}")
+                expired = True
+            elif isinstance(result, BaseException):
+                raise result
+        if expired and self.budget.run_expired():
+            raise DeadlineExceeded("run budget expired")
+
+    def execute(self):
+        asyncio.run(self.execute_async())
+
+
+ENGINES = {
+    'sync': MediaSyncManager,
+    'async': AsyncMediaSyncManager
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sync MDBList lists to Radarr/Sonarr")
+    parser.add_argument("--config", default="config.json", help="Path to config file")
+    parser.add_argument(
+        "--engine", choices=sorted(ENGINES), default="sync",
+        help="sync runs requests one after another; async overlaps independent requests"
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    # You can specify a different config path if needed
-    manager = MediaSyncManager("config.json")
+    args = parse_args()
+    manager = ENGINES[args.engine](args.config)
     manager.run()
\ No newline at end of file
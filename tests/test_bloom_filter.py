@@ -0,0 +1,39 @@
+import random
+import struct
+
+import pytest
+
+from media_sync import BloomFilter
+
+
+def test_no_false_negatives_and_rate_close_to_target(tmp_path):
+    rng = random.Random(7)
+    members = rng.sample(range(1, 10_000_000), 5000)
+    bloom = BloomFilter(len(members), 0.01)
+    for tmdb_id in members:
+        bloom.add(tmdb_id)
+    bloom.write(tmp_path / 'library.bloom')
+    loaded = BloomFilter.load(tmp_path / 'library.bloom')
+
+    assert all(tmdb_id in bloom and tmdb_id in loaded for tmdb_id in members)
+
+    others = rng.sample(range(10_000_000, 20_000_000), 20000)
+    false_positives = sum(tmdb_id in loaded for tmdb_id in others)
+    assert false_positives / len(others) < 0.02
+
+
+def test_sequential_ids_spread_over_the_filter():
+    bloom = BloomFilter(1000, 0.01)
+    for tmdb_id in range(1, 1001):
+        bloom.add(tmdb_id)
+
+    assert sum(tmdb_id in bloom for tmdb_id in range(1001, 21001)) / 20000 < 0.02
+
+
+@pytest.mark.parametrize("content", [b'', b'\x00' * 16, b'SBF1' + b'\x00' * 40])
+def test_load_rejects_files_of_another_format(tmp_path, content):
+    path = tmp_path / 'library.bloom'
+    path.write_bytes(content)
+
+    with pytest.raises((ValueError, struct.error)):
+        BloomFilter.load(path)
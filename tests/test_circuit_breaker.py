@@ -0,0 +1,94 @@
+import pytest
+
+import media_sync
+from media_sync import CircuitBreaker, CircuitOpenError, HttpSessionPool
+
+PROXY = 'http://proxy.test'
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(media_sync.time, 'time', lambda: now[0])
+    return now
+
+
+def test_opens_after_threshold_and_half_opens_after_cooldown(clock):
+    breaker = CircuitBreaker('radarr', failure_threshold=2, cooldown=60)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow() and not breaker.available()
+
+    clock[0] += 60
+    assert breaker.available()
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one trial request at a time
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker('radarr', failure_threshold=3, cooldown=60, state={'state': 'open', 'opened_at': 0})
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN and breaker.opened_at == clock[0]
+
+
+def test_unfinished_trial_is_saved_open(clock):
+    breaker = CircuitBreaker('radarr', failure_threshold=1, cooldown=0)
+    breaker.record_failure()
+    assert breaker.allow()
+
+    saved = breaker.to_dict()
+    assert saved['state'] == CircuitBreaker.OPEN
+    assert CircuitBreaker('radarr', 1, 0, saved).state == CircuitBreaker.OPEN
+
+
+def make_pool(statuses):
+    pool = HttpSessionPool()
+    breakers = {}
+    for service in ('radarr', 'sonarr'):
+        breakers[service] = CircuitBreaker(service, failure_threshold=2, cooldown=600)
+        pool.register(f"{PROXY}/{service}", headers={'X-Api-Key': service.upper()}, breaker=breakers[service])
+
+    sent = []
+
+    def send(session, method, url, bucket, policy, **kwargs):
+        sent.append((url, session.headers.get('X-Api-Key')))
+        return FakeResponse(statuses.get(url.split('/')[3], 200))
+
+    pool._send = send
+    return pool, breakers, sent
+
+
+def test_services_behind_one_proxy_have_their_own_breaker(clock):
+    pool, breakers, sent = make_pool({'radarr': 503})
+    for _ in range(2):
+        pool.get(f"{PROXY}/radarr/api/v3/movie")
+
+    with pytest.raises(CircuitOpenError):
+        pool.get(f"{PROXY}/radarr/api/v3/movie")
+    assert pool.get(f"{PROXY}/sonarr/api/v3/series").status_code == 200
+
+    assert breakers['radarr'].state == CircuitBreaker.OPEN
+    assert breakers['sonarr'].state == CircuitBreaker.CLOSED
+    assert sent[-1] == (f"{PROXY}/sonarr/api/v3/series", 'SONARR')
+
+
+def test_client_errors_do_not_trip_the_breaker(clock):
+    pool, breakers, _ = make_pool({'radarr': 400})
+    for _ in range(5):
+        pool.post(f"{PROXY}/radarr/api/v3/movie")
+
+    assert breakers['radarr'].state == CircuitBreaker.CLOSED
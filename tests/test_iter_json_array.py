@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from media_sync import iter_json_array
+
+
+def split_every(text: str, size: int):
+    data = text.encode()
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+DOCUMENTS = [
+    '[]',
+    '[1, 22, 333]',
+    '[1.5, -2e10, 3E-2, 0.25]',
+    '[true, false, null]',
+    '["a,b", "quote \\" ]", "caf\\u00e9", "naïve"]',
+    '[{"tmdbId": 1, "title": "A"}, {"tmdbId": 2, "nested": [1, {"x": 2}]}]',
+    ' \n[ 1 ,\n{"a": "b"} , [2, 3] ]\n',
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64])
+def test_matches_json_loads_for_any_chunk_size(document, size):
+    assert list(iter_json_array(split_every(document, size))) == json.loads(document)
+
+
+@pytest.mark.parametrize("chunks, expected", [
+    ([b'[1', b'2]'], [12]),
+    ([b'[1.', b'5]'], [1.5]),
+    ([b'[1e', b'3, 2]'], [1000.0, 2]),
+    ([b'[-', b'4]'], [-4]),
+    ([b'[7', b'', b'0', b']'], [70]),
+    ([b'[tr', b'ue]'], [True]),
+])
+def test_scalars_split_at_chunk_boundary(chunks, expected):
+    assert list(iter_json_array(chunks)) == expected
+
+
+def test_multibyte_character_split_across_chunks():
+    data = '["é"]'.encode()
+    assert list(iter_json_array([data[:3], data[3:]])) == ["é"]
+
+
+def test_elements_are_yielded_lazily():
+    def chunks():
+        yield b'[{"a": 1}, '
+        raise AssertionError("read past the first element")
+
+    assert next(iter_json_array(chunks())) == {"a": 1}
+
+
+@pytest.mark.parametrize("chunks", [[b'{"a": 1}'], [b'[1, 2'], [b'']])
+def test_rejects_non_arrays_and_truncated_input(chunks):
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunks))
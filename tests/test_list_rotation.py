@@ -0,0 +1,77 @@
+from collections import Counter
+
+import pytest
+
+from media_sync import ListRotation
+
+
+def make_lists(*weights):
+    return [{'id': index, 'name': f"list {index}", 'weight': weight} for index, weight in enumerate(weights)]
+
+
+def run_rotation(path, lists, runs, slots, yields=None, reserve=True):
+    """Simulate `runs` hourly runs, reloading the saved credits each time"""
+    counts = Counter()
+    for _ in range(runs):
+        rotation = ListRotation(path)
+        for list_meta in rotation.schedule('movies', lists, slots, reserve=reserve):
+            counts[list_meta['id']] += 1
+            if yields is None or yields(list_meta):
+                rotation.record_add('movies', list_meta['id'])
+        rotation.save()
+    return counts
+
+
+@pytest.mark.parametrize("slots", [1, 3, 4, 7])
+def test_slots_follow_weights_across_runs(tmp_path, slots):
+    lists = make_lists(1, 1, 2, 0.5)
+    runs = 90
+    counts = run_rotation(tmp_path / 'rotation.json', lists, runs, slots)
+
+    total = runs * slots
+    for list_meta in lists:
+        expected = total * list_meta['weight'] / 4.5
+        assert abs(counts[list_meta['id']] - expected) <= 2
+
+
+def test_more_lists_than_slots_still_reaches_every_list(tmp_path):
+    lists = make_lists(1, 1, 1, 1, 1)
+    counts = run_rotation(tmp_path / 'rotation.json', lists, 10, 1)
+    assert all(counts[list_meta['id']] == 2 for list_meta in lists)
+
+
+def test_barren_list_is_charged_and_does_not_stall(tmp_path):
+    lists = make_lists(1, 1, 1)
+    counts = run_rotation(tmp_path / 'rotation.json', lists, 30, 2, yields=lambda list_meta: list_meta['id'] != 0)
+    assert counts == {0: 20, 1: 20, 2: 20}
+
+
+def test_credits_sum_to_zero_and_persist(tmp_path):
+    path = tmp_path / 'rotation.json'
+    lists = make_lists(3, 1, 0.5)
+    run_rotation(path, lists, 7, 3)
+
+    credits = ListRotation(path).credits['movies']
+    assert sum(credits.values()) == pytest.approx(0, abs=1e-4)
+
+    # A fresh schedule carries on from the saved credits
+    first = ListRotation(path).schedule('movies', lists, 1)[0]
+    assert str(first['id']) == max(credits, key=lambda list_id: credits[list_id] + lists[int(list_id)]['weight'])
+
+
+def test_zero_weights_fall_back_to_equal_shares(tmp_path):
+    lists = make_lists(0, 0)
+    counts = run_rotation(tmp_path / 'rotation.json', lists, 10, 1)
+    assert counts == {0: 5, 1: 5}
+
+
+def test_advisory_schedule_charges_only_adds(tmp_path):
+    path = tmp_path / 'rotation.json'
+    lists = make_lists(1, 1)
+    rotation = ListRotation(path)
+    rotation.schedule('movies', lists, 2, reserve=False)
+    rotation.record_add('movies', 1)
+    rotation.record_add('movies', 1)
+    rotation.save()
+
+    assert ListRotation(path).credits['movies'] == {'0': 2.0, '1': -2.0}
@@ -0,0 +1,73 @@
+import json
+import random
+import threading
+
+import pytest
+
+from media_sync import LibraryIndex, MediaSyncManager
+
+
+def make_manager(tmp_path, lookahead):
+    tmp_path.mkdir()
+    config = {
+        'state_dir': str(tmp_path / 'state'),
+        'radarr': {
+            'base_url': 'http://radarr.test', 'port': '7878', 'api_key': 'K',
+            'fast_add': False, 'lookahead': lookahead
+        },
+        'journal': {'enabled': False},
+        'outbox': {'enabled': False}
+    }
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps(config))
+    return MediaSyncManager(str(config_path))
+
+
+def scenario(seed):
+    rng = random.Random(seed)
+    lists = [
+        {'id': list_id, 'name': f"List {list_id}", 'qualityProfileId': 1, 'rootFolderPath': '/movies'}
+        for list_id in range(rng.randint(1, 4))
+    ]
+    # Lists share titles, so a title taken by one slot changes what later slots pick
+    items = {
+        list_meta['id']: [
+            {'id': rng.randint(1, 60), 'title': 'x', 'mediatype': rng.choice(['movie'] * 9 + ['show'])}
+            for _ in range(rng.randint(0, 20))
+        ]
+        for list_meta in lists
+    }
+    slots = [rng.choice(lists) for _ in range(rng.randint(1, 8))]
+    existing = set(rng.sample(range(1, 61), 10))
+    outcomes = {tmdb_id: rng.choice(['ok'] * 5 + ['lookup', 'transient', 'rejected']) for tmdb_id in range(1, 61)}
+    return slots, items, existing, outcomes, len(slots)
+
+
+def run(manager, adder, seed):
+    slots, items, existing, outcomes, capacity = scenario(seed)
+    attempts = []
+    lock = threading.Lock()
+
+    def lookup(tmdb_id):
+        return None if outcomes[tmdb_id] == 'lookup' else {'tmdbId': tmdb_id, 'title': 'x'}
+
+    def add(movie_data, list_meta):
+        tmdb_id = movie_data['tmdbId']
+        with lock:
+            attempts.append((tmdb_id, list_meta['id']))
+        if outcomes[tmdb_id] == 'rejected':
+            manager.negative_cache.record('radarr', tmdb_id, 'rejected')
+        return outcomes[tmdb_id] == 'ok'
+
+    manager.radarr_lookup_movie = lookup
+    manager.radarr_add_movie = add
+    added = getattr(manager, adder)(slots, items, LibraryIndex(existing), capacity)
+    return added, attempts
+
+
+@pytest.mark.parametrize("lookahead", [1, 3, 8])
+def test_pipeline_makes_the_same_adds_as_sequential(tmp_path, lookahead):
+    for seed in range(200):
+        sequential = run(make_manager(tmp_path / f"seq-{seed}", 0), 'add_movies', seed)
+        pipelined = run(make_manager(tmp_path / f"pipe-{seed}", lookahead), 'add_movies_pipelined', seed)
+        assert pipelined == sequential, f"seed {seed}"
@@ -0,0 +1,116 @@
+import json
+import time
+
+import pytest
+import requests
+
+from media_sync import LibraryIndex, MediaSyncManager, SortedIdFile, load_json_state, save_json_state
+
+LIST = {'id': 1, 'name': "List 1", 'qualityProfileId': 1, 'rootFolderPath': '/movies'}
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body=None):
+        self.status_code = status_code
+        self.body = body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture
+def manager(tmp_path):
+    config = {
+        'state_dir': str(tmp_path / 'state'),
+        'radarr': {'base_url': 'http://radarr.test', 'port': '7878', 'api_key': 'K'},
+        'exclusions': {'enabled': False},
+        'journal': {'enabled': False},
+        'movies': [LIST]
+    }
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps(config))
+    return MediaSyncManager(str(config_path))
+
+
+def script_posts(manager, statuses):
+    """Answer POSTs with the given status codes, in order, and record the TMDB IDs sent"""
+    statuses = list(statuses)
+    posted = []
+
+    def post(url, json=None, **kwargs):
+        posted.append(json['tmdbId'])
+        status = statuses.pop(0)
+        return FakeResponse(status, {'id': len(posted), 'tmdbId': json['tmdbId']})
+
+    manager.http.post = post
+    return posted
+
+
+def movies(*tmdb_ids):
+    return [{'id': tmdb_id, 'title': f"Movie {tmdb_id}", 'mediatype': 'movie'} for tmdb_id in tmdb_ids]
+
+
+def seed_library(manager, service='radarr', tmdb_ids=()):
+    meta_path, tmdb_path, tvdb_path, _ = manager._library_paths(service)
+    SortedIdFile.write(tmdb_path, tmdb_ids)
+    SortedIdFile.write(tvdb_path, [])
+    save_json_state(meta_path, {'refreshed_at': time.time(), 'added_tmdb_ids': [], 'added_tvdb_ids': []})
+    return meta_path
+
+
+def test_filled_slot_resolves_its_failed_adds(manager):
+    posted = script_posts(manager, [503, 503, 201])
+
+    added = manager.add_movies([LIST], {1: movies(10, 11, 12)}, LibraryIndex(), 1)
+
+    assert added == 1
+    assert posted == [10, 11, 12]
+    assert manager.outbox.entries == {}
+
+
+def test_unfilled_slot_keeps_its_failed_add(manager):
+    script_posts(manager, [503])
+
+    added = manager.add_movies([LIST], {1: movies(10)}, LibraryIndex(), 1)
+
+    assert added == 0
+    assert list(manager.outbox.entries) == ['radarr:10']
+
+
+def test_rejected_add_leaves_no_entry(manager):
+    script_posts(manager, [400, 400, 201])
+    manager.http.get = lambda url, **kwargs: FakeResponse(200, [{'tmdbId': 10, 'title': "Movie 10"}])
+    manager.lookup_cache = None
+
+    added = manager.add_movies([LIST], {1: movies(10, 11)}, LibraryIndex(), 1)
+
+    assert added == 1
+    assert manager.outbox.entries == {}
+
+
+def test_replayed_adds_reach_the_library_index_without_loading_it(manager, tmp_path):
+    meta_path = seed_library(manager, tmdb_ids=[1, 2])
+    for tmdb_id in (10, 11):
+        manager.outbox.put('radarr', {'tmdbId': tmdb_id, 'title': f"Movie {tmdb_id}"}, LIST)
+    script_posts(manager, [201, 201])
+
+    # Replay uses all the capacity, so the library is never loaded this run
+    assert manager.replay_outbox(2, 0) == (2, 0)
+    assert manager.outbox.entries == {}
+    assert load_json_state(meta_path, None)['added_tmdb_ids'] == [10, 11]
+
+    library = MediaSyncManager(str(tmp_path / 'config.json')).load_library('radarr')
+    assert 10 in library and 11 in library and 1 in library
+    assert 12 not in library
+
+
+def test_replay_without_saved_index_changes_nothing(manager):
+    manager.outbox.put('radarr', {'tmdbId': 10, 'title': "Movie 10"}, LIST)
+    script_posts(manager, [201])
+
+    assert manager.replay_outbox(1, 0) == (1, 0)
+    assert not manager._library_paths('radarr')[0].exists()
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from media_sync import DeadlineExceeded, MediaSyncManager, RunJournal
+
+
+@pytest.fixture
+def manager(tmp_path):
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps({'state_dir': str(tmp_path / 'state')}))
+    return MediaSyncManager(str(config_path))
+
+
+def events(journal):
+    return [record['event'] for record in journal.load()]
+
+
+def test_records_survive_and_torn_line_is_ignored(tmp_path):
+    journal = RunJournal(tmp_path / 'journal.jsonl')
+    journal.open(resume=False)
+    journal.record('add', kind='movies', tmdb_id=1)
+    journal.close(finished=False)
+    with open(journal.path, 'a') as f:
+        f.write('{"event": "ad')
+
+    assert events(journal) == ['started', 'add']
+
+
+def test_resume_appends_to_the_interrupted_journal(tmp_path):
+    journal = RunJournal(tmp_path / 'journal.jsonl')
+    journal.open(resume=False)
+    journal.close(finished=False)
+    journal.open(resume=True)
+    journal.record('add', kind='shows', tmdb_id=2)
+    journal.close(finished=True)
+
+    assert events(journal) == ['started', 'add', 'finished']
+
+
+def test_disabled_journal_writes_nothing(tmp_path):
+    journal = RunJournal(tmp_path / 'journal.jsonl', enabled=False)
+    journal.open(resume=False)
+    journal.record('add', kind='movies', tmdb_id=1)
+    journal.close(finished=True)
+
+    assert not journal.path.exists()
+
+
+def test_completed_run_is_finished(manager):
+    manager.execute = lambda: None
+    manager.run()
+
+    assert events(manager.journal)[-1] == 'finished'
+    assert manager.load_resume_state() == {}
+
+
+def test_run_stopped_by_deadline_is_finished(manager):
+    def execute():
+        raise DeadlineExceeded("run deadline reached")
+    manager.execute = execute
+    manager.run()
+
+    assert events(manager.journal)[-1] == 'finished'
+
+
+@pytest.mark.parametrize("error", [KeyboardInterrupt, RuntimeError])
+def test_crashed_run_is_left_to_resume(manager, error):
+    def execute():
+        manager.journal.record('add', kind='movies', tmdb_id=7)
+        raise error()
+    manager.execute = execute
+    with pytest.raises(error):
+        manager.run()
+
+    assert events(manager.journal) == ['started', 'add']
+    assert manager.load_resume_state()['added'] == {'movies': 1, 'shows': 0}